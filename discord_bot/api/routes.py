@@ -5,6 +5,8 @@ from fastapi.requests import Request
 from fastapi.responses import JSONResponse
 
 from discord_bot.api.app import templates, app
+from discord_bot.content_generation.token_pool import get_token_pool
+from discord_bot.music_player.probe_cache import get_probe_cache
 from discord_bot.propaganda_bot import PropagandaBot
 from discord_bot.models.bot_state import get_bot_state
 from discord_bot.models.propaganda_config import get_propaganda_config
@@ -34,8 +36,7 @@ async def start_bot():
         bot_state.thread = Thread(target=run_discord_bot,
                                   args=[propaganda_bot, tokens_config], daemon=True)
         bot_state.thread.start()
-        # steam_monitor = get_steam_monitor(propaganda_bot)
-        # await steam_monitor.start()
+        # The bot starts Steam monitoring on its own loop once it is ready
     except Exception as e:
         logger.error(f"Failed to start bot: {e}")
         bot_state.status = f"Error: {str(e)}"
@@ -47,3 +48,13 @@ async def start_bot():
 @app.get('/bot_status')
 def get_bot_status():
     return JSONResponse({"status": bot_state.status})
+
+
+@app.get('/token_pool')
+def get_token_pool_status():
+    return JSONResponse({"tokens": get_token_pool().snapshot()})
+
+
+@app.get('/probe_cache')
+def get_probe_cache_status():
+    return JSONResponse(get_probe_cache().stats())
@@ -1,10 +1,10 @@
 import logging
 
 import pytz
-from discord import Interaction, Embed, Color
+from discord import Interaction, Embed, Color, app_commands
 from pytz import UnknownTimeZoneError
 
-from discord_bot.models.propaganda_config import save_settings_to_file
+from discord_bot.models.propaganda_config import PropagandaSchedulerTimeConfig
 from discord_bot.propaganda_bot import PropagandaBot
 from discord_bot.models.token_config import TokenConfig
 from discord_bot.scheduler import setup_scheduler
@@ -14,54 +14,56 @@ logger = logging.getLogger(__name__)
 
 def register_config_commands(bot: PropagandaBot, api_tokens: list[str]):
     config = bot.propaganda_config
+    guild_configs = bot.guild_configs
 
     @bot.tree.command(
         name="set_channel",
         description="Set the current channel for propaganda posters")
+    @app_commands.guild_only()
     async def set_channel(interaction: Interaction):
-        config.propaganda_scheduler.poster_output_channel_id = interaction.channel_id
-        save_settings_to_file(config)
+        await guild_configs.update(interaction.guild_id, poster_output_channel_id=interaction.channel_id)
+        await setup_scheduler(bot, api_tokens)
         await interaction.response.send_message(
             "Channel set for propaganda posters.")
 
     @bot.tree.command(
         name="set_voice_channel",
         description="Set the voice channel for music playback")
+    @app_commands.guild_only()
     async def set_voice_channel(interaction: Interaction):
         if not interaction.user.voice:
             await interaction.response.send_message(
                 "You must be in a voice channel to set it!")
             return
-        config.propaganda_scheduler.voice_channel_id = interaction.user.voice.channel.id
-        save_settings_to_file(config)
+        await guild_configs.update(interaction.guild_id, voice_channel_id=interaction.user.voice.channel.id)
         await interaction.response.send_message(
             f"Voice channel set to: {interaction.user.voice.channel.name}")
 
     @bot.tree.command(name="set_time",
                       description="Set the time for daily posts (HH:MM)")
+    @app_commands.guild_only()
     async def set_time(interaction: Interaction, time: str):
         try:
             hour, minute = map(int, time.split(':'))
-            config.propaganda_scheduler.time.hour = hour
-            config.propaganda_scheduler.time.minute = minute
-            save_settings_to_file(config)
-            setup_scheduler(bot, api_tokens)
+            await guild_configs.update(interaction.guild_id,
+                                       time=PropagandaSchedulerTimeConfig(hour=hour, minute=minute))
+            await setup_scheduler(bot, api_tokens)
             await interaction.response.send_message(
-                f"Post time set to {time} & Restarted Scheduler")
+                f"Post time set to {time} & Rescheduled")
         except ValueError:
             await interaction.response.send_message(
                 "Invalid time format. Use HH:MM (e.g., 15:30)")
 
     @bot.tree.command(name="set_timezone", description="Set the timezone")
+    @app_commands.guild_only()
     async def set_timezone(interaction: Interaction,
                            timezone: str):
         try:
             pytz.timezone(timezone)
-            config.propaganda_scheduler.timezone = timezone
-            save_settings_to_file(config)
-            setup_scheduler(bot, api_tokens)
+            await guild_configs.update(interaction.guild_id, timezone=timezone)
+            await setup_scheduler(bot, api_tokens)
             await interaction.response.send_message(
-                f"Timezone set to: {timezone} & Restarted Scheduler")
+                f"Timezone set to: {timezone} & Rescheduled")
         except UnknownTimeZoneError:
             await interaction.response.send_message(
                 f"Invalid timezone: {timezone}. Example: US/Eastern, Europe/London.")
@@ -71,8 +73,10 @@ def register_config_commands(bot: PropagandaBot, api_tokens: list[str]):
 
     @bot.tree.command(name="show_config",
                       description="Show current configuration")
+    @app_commands.guild_only()
     async def show_config(interaction: Interaction):
-        channel_mention = f"<#{config.propaganda_scheduler.poster_output_channel_id}>" if config.propaganda_scheduler.poster_output_channel_id else "Not set"
+        guild_config = guild_configs.get(interaction.guild_id)
+        channel_mention = f"<#{guild_config.poster_output_channel_id}>" if guild_config.poster_output_channel_id else "Not set"
         # Truncate text prompt if too long
         text_prompt = config.text_prompt
         if len(text_prompt) > 900:
@@ -84,7 +88,7 @@ def register_config_commands(bot: PropagandaBot, api_tokens: list[str]):
         embed.add_field(
             name="Post Time",
             value=
-            f"{config.propaganda_scheduler.time.hour:02d}:{config.propaganda_scheduler.time.minute:02d} {config.propaganda_scheduler.timezone}",
+            f"{guild_config.time.hour:02d}:{guild_config.time.minute:02d} {guild_config.timezone}",
             inline=True)
         embed.add_field(name="Text Prompt",
                         value=text_prompt,
@@ -1,8 +1,10 @@
-from discord import Interaction
+from discord import Interaction, Embed, Color
 
 from discord_bot.propaganda_bot import PropagandaBot
 from discord_bot.commands.config_commands import logger
 
+QUEUE_LISTING_LIMIT = 10
+
 
 def register_music_player_commands(bot: PropagandaBot):
     music_player = bot.music_player
@@ -24,17 +26,46 @@ def register_music_player_commands(bot: PropagandaBot):
                 f"Error playing music: {str(e)}")
             logger.error(f"Error in play command: {e}", exc_info=True)
 
+    @bot.tree.command(name="skip", description="Skip the current track")
+    async def skip(interaction: Interaction):
+        if not music_player.skip(interaction.guild_id):
+            await interaction.response.send_message("Nothing is playing!")
+            return
+        await interaction.response.send_message("⏭️ Skipped!")
+
+    @bot.tree.command(name="queue", description="Show the upcoming tracks")
+    async def queue(interaction: Interaction):
+        player = music_player.get_player(interaction.guild_id)
+        if not player or not player.queue:
+            await interaction.response.send_message("The queue is empty!")
+            return
+
+        tracks = list(player.queue)
+        listing = "\n".join(f"{position}. {item.track.title}"
+                            for position, item in enumerate(tracks[:QUEUE_LISTING_LIMIT], start=1))
+        if len(tracks) > QUEUE_LISTING_LIMIT:
+            listing += f"\n...and {len(tracks) - QUEUE_LISTING_LIMIT} more"
+        embed = Embed(title="Queue", description=listing, color=Color.orange())
+        await interaction.response.send_message(embed=embed)
+
+    @bot.tree.command(name="now_playing", description="Show the track that is playing")
+    async def now_playing(interaction: Interaction):
+        player = music_player.get_player(interaction.guild_id)
+        if not player or not player.now_playing:
+            await interaction.response.send_message("Nothing is playing!")
+            return
+
+        item = player.now_playing
+        requested_by = f" (requested by {item.requested_by})" if item.requested_by else ""
+        await interaction.response.send_message(
+            f"🎵 Now playing: [{item.track.title}]({item.track.url}){requested_by}")
+
     @bot.tree.command(name="leave", description="Leave the voice channel")
     async def leave(interaction: Interaction):
-        if interaction.guild_id not in music_player.voice_clients:
+        if not await music_player.leave(interaction.guild_id):
             await interaction.response.send_message(
                 "I'm not in a voice channel!")
             return
 
-        voice_client = music_player.voice_clients[
-            interaction.guild_id]
-        await voice_client.disconnect()
-        music_player.voice_clients.pop(interaction.guild_id)
-
         await interaction.response.send_message(
             "Left the voice channel!")
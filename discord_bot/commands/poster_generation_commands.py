@@ -1,14 +1,69 @@
-from discord import Interaction
+from io import BytesIO
+
+from discord import File, Interaction, app_commands
 
 from discord_bot.propaganda_bot import PropagandaBot
-from discord_bot.content_generation.generate_poster import generate_propaganda_poster
+from discord_bot.content_generation.generate_poster import (generate_propaganda_poster, generate_poster_variants,
+                                                            take_poster)
+from discord_bot.content_generation.generation_queue import GenerationQueueFull
 
 
 def register_poster_generation_commands(bot: PropagandaBot, api_tokens: list[str]) -> None:
     @bot.tree.command(
         name="generate",
         description="Generate a propaganda poster immediately")
-    async def generate(interaction: Interaction):
+    @app_commands.describe(count="How many poster variants to generate")
+    async def generate(interaction: Interaction, count: app_commands.Range[int, 1, 10] = 1):
+        # Only requests for the same prompt in the same channel are identical; everything else is a separate
+        # job that goes through the queue's per-user limits and guild/user round-robin
+        prompt = bot.propaganda_config.text_prompt.strip()
+        if count > 1:
+            key = f"{prompt}#{count}@{interaction.channel_id}"
+            factory = lambda: generate_poster_variants(bot, api_tokens, [interaction.channel], count)
+        else:
+            key = f"{prompt}@{interaction.channel_id}"
+            factory = lambda: take_poster(bot, api_tokens)
+
+        try:
+            ticket = bot.generation_queue.submit(
+                key,
+                interaction.guild_id,
+                interaction.user.id,
+                factory)
+        except GenerationQueueFull as e:
+            await interaction.response.send_message(f"⌛ {e}", ephemeral=True)
+            return
+
+        if ticket.joined:
+            await interaction.response.send_message(
+                "A True Piece is already in the Making for this channel 🚬.", ephemeral=True)
+            return
+
+        if ticket.position:
+            await interaction.response.send_message(
+                f"A True Piece is queued at position {ticket.position}... Smoke a true cigarette in the meanwhile 🚬.")
+        else:
+            await interaction.response.send_message(
+                "A True Piece is in the Making... Smoke a true cigarette in the meanwhile 🚬.")
+
+        if count > 1:
+            await ticket.result
+        else:
+            await generate_propaganda_poster(bot, api_tokens, [interaction.channel], ticket=ticket)
+
+    @bot.tree.command(
+        name="replay",
+        description="Post an archived propaganda poster without generating a new one")
+    async def replay(interaction: Interaction, key: str = None):
+        poster = await bot.poster_archive.load(key)
+        if poster is None:
+            recent = await bot.poster_archive.recent(limit=5)
+            listing = "\n".join(f"`{archived_key[:12]}` {prompt[:60]}" for archived_key, prompt, _ in recent)
+            await interaction.response.send_message(
+                f"No archived poster found.\n{listing}" if listing else "The poster archive is empty.",
+                ephemeral=True)
+            return
+
         await interaction.response.send_message(
-            "A True Piece is in the Making... Smoke a true cigarette in the meanwhile 🚬.")
-        await generate_propaganda_poster(bot, api_tokens, interaction.channel)
+            file=File(BytesIO(poster.image), filename=poster.filename),
+            content=f"**{bot.propaganda_config.poster_caption}**")
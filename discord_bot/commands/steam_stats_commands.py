@@ -0,0 +1,41 @@
+from time import time
+
+import pytz
+from discord import Color, Embed, Interaction
+
+from discord_bot.propaganda_bot import PropagandaBot
+from steam_monitor.game_rules import CS2_GAME_ID
+from steam_monitor.steam_monitor import get_steam_monitor
+
+STATS_LISTING_LIMIT = 10
+WEEK_SECONDS = 7 * 24 * 3600
+
+
+def _ranked(values: dict, formatter) -> str:
+    ranked = sorted(values.items(), key=lambda item: item[1], reverse=True)[:STATS_LISTING_LIMIT]
+    return "\n".join(f"{name}: {formatter(value)}" for name, value in ranked)
+
+
+def register_steam_stats_commands(bot: PropagandaBot):
+
+    @bot.tree.command(name="cs2_stats", description="Show CS2 hours this week, streaks and who's online")
+    async def cs2_stats(interaction: Interaction):
+        history = get_steam_monitor(bot).history
+        # Days are counted in the asking server's timezone
+        timezone = pytz.timezone(bot.guild_configs.get(interaction.guild_id).timezone if interaction.guild_id
+                                 else bot.propaganda_config.propaganda_scheduler.timezone)
+        now = time()
+
+        hours = history.hours_played(CS2_GAME_ID, now - WEEK_SECONDS, now)
+        streaks = history.streaks(CS2_GAME_ID, now, timezone)
+        online = history.online_players()
+
+        embed = Embed(title="CS2 stats", color=Color.orange())
+        embed.add_field(name="Hours this week", value=_ranked(hours, lambda value: f"{value:.1f}h") or "Nobody played",
+                        inline=False)
+        embed.add_field(name="Streaks", value=_ranked(streaks, lambda value: f"{value} days") or "No active streaks",
+                        inline=False)
+        online_listing = "\n".join(f"{name} 🎮" if game_id == CS2_GAME_ID else name
+                                   for name, game_id in online[:STATS_LISTING_LIMIT])
+        embed.add_field(name="Online now", value=online_listing or "Nobody is online", inline=False)
+        await interaction.response.send_message(embed=embed)
@@ -1,100 +1,264 @@
-import os
-from asyncio import sleep
+from asyncio import FIRST_COMPLETED, CancelledError, Semaphore, Task, as_completed, create_task, gather, wait
+from base64 import b64decode
+from io import BytesIO
 from logging import getLogger
+from time import monotonic
 
 from aiohttp import ClientSession
-from discord import File
+from discord import Color, Embed, File
 
-from discord_bot.models.token_config import TokenConfig
+from discord_bot.content_generation.generation_queue import GenerationTicket
+from discord_bot.content_generation.job_poller import get_job_poller
+from discord_bot.content_generation.post_processing import post_process_poster
+from discord_bot.content_generation.token_pool import get_token_pool
+from discord_bot.models.poster import Poster
+from discord_bot.models.propaganda_config import PropagandaConfig
 
 logger = getLogger(__name__)
 
 
-async def generate_propaganda_poster(bot, api_tokens: list[str], channel: str = None):
-    """Generate a propaganda poster and post it to the specified channel."""
-    channel_id = bot.propaganda_config.propaganda_scheduler.poster_output_channel_id
-    if channel is None and channel_id:
-        channel = bot.get_channel(channel_id)
+class WaveSpeedError(Exception):
+    def __init__(self, message: str, status: int, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
 
-    if not channel:
+
+def get_output_channels(bot, scheduler_config=None) -> list:
+    """The configured poster channels that the bot can currently see, primary channel first.
+
+    `scheduler_config` is a guild's configuration; the global scheduler settings are used by default.
+    """
+    scheduler_config = scheduler_config or bot.propaganda_config.propaganda_scheduler
+    channel_ids = dict.fromkeys([scheduler_config.poster_output_channel_id, *scheduler_config.poster_output_channel_ids])
+    channels = []
+    for channel_id in filter(None, channel_ids):
+        if channel := bot.get_channel(channel_id):
+            channels.append(channel)
+        else:
+            logger.error(f"Could not find channel with ID {channel_id}")
+    return channels
+
+
+async def generate_propaganda_poster(bot, api_tokens: list[str], channels: list = None,
+                                     ticket: GenerationTicket = None):
+    """Generate a propaganda poster and post it to the given channels (the configured ones by default).
+
+    When a generation queue ticket is given, the poster comes from that queued job instead.
+    """
+    channels = channels or get_output_channels(bot)
+    if not channels:
         logger.error("No channel set for posting propaganda poster")
         return
 
     try:
-        async with channel.typing():
-            # Get text and configuration from propaganda_config
-            text_prompt = bot.propaganda_config.text_prompt
-
-            # Generate the poster text
-            poster_text = text_prompt.strip()
-            if not poster_text:
-                raise ValueError("Failed to generate poster text")
-
-            # Generate the poster image using the text and configuration
-            image_url = await __generate_poster_image(
-                poster_text,
-                api_tokens,
-                max_retries=bot.propaganda_config.max_retries)
-            if not image_url:
-                raise ValueError("Failed to generate poster image")
-
-            # Create message with the poster
-            with open(image_url, 'rb') as f:
-                file = File(f, filename='propaganda_poster.png')
-                await channel.send(
-                    file=file,
-                    content=f"**{bot.propaganda_config.poster_caption}**")
-
-            # Clean up the temporary file
+        if ticket:
+            await ticket.started.wait()
+        async with channels[0].typing():
+            poster = await (ticket.result if ticket else take_poster(bot, api_tokens))
+            await broadcast_poster(bot, poster, channels, f"**{bot.propaganda_config.poster_caption}**")
+
+        await __archive_poster(bot, poster)
+
+    except Exception as e:
+        await __report_generation_error(channels[0], e)
+
+
+async def generate_poster_variants(bot, api_tokens: list[str], channels: list = None, count: int = None):
+    """Generate several poster variants concurrently and post each one as soon as it is ready."""
+    config = bot.propaganda_config
+    channels = channels or get_output_channels(bot)
+    if not channels:
+        logger.error("No channel set for posting propaganda poster")
+        return
+
+    count = count or config.poster_variants
+    semaphore = Semaphore(config.variant_concurrency)
+
+    async def render_variant() -> Poster:
+        async with semaphore:
+            return await take_poster(bot, api_tokens)
+
+    last_error = None
+    posted = 0
+    async with channels[0].typing():
+        for variant in as_completed([render_variant() for _ in range(count)]):
+            try:
+                poster = await variant
+                await broadcast_poster(bot, poster, channels, f"**{config.poster_caption}** ({posted + 1}/{count})")
+                posted += 1
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Poster variant failed: {e}")
+                continue
+            await __archive_poster(bot, poster)
+
+    logger.info(f"Posted {posted}/{count} propaganda poster variants")
+    if not posted and last_error:
+        await __report_generation_error(channels[0], last_error)
+
+
+async def broadcast_poster(bot, poster: Poster, channels: list, content: str) -> None:
+    """Upload the poster once and share its attachment URL with the other channels concurrently.
+
+    The upload goes to the first channel that accepts it, so one unavailable channel does not stop the
+    broadcast; it only fails when no channel accepts the upload.
+    """
+    message = None
+    last_error = None
+    for index, channel in enumerate(channels):
+        try:
+            message = await channel.send(file=File(BytesIO(poster.image), filename=poster.filename), content=content)
+        except Exception as e:
+            last_error = e
+            logger.warning(f"Failed to upload poster to channel {channel.name}: {e}")
+            continue
+        logger.info(f"Posted propaganda poster to channel {channel.name}")
+        break
+    if message is None:
+        raise last_error
+    remaining = channels[:index] + channels[index + 1:]
+    if not remaining:
+        return
+
+    embed = Embed(color=Color.orange()).set_image(url=message.attachments[0].url)
+    semaphore = Semaphore(bot.propaganda_config.broadcast_concurrency)
+
+    async def send_copy(channel) -> bool:
+        async with semaphore:
             try:
-                os.remove(image_url)
+                await channel.send(content=content, embed=embed)
             except Exception as e:
-                logger.warning(f"Failed to delete temporary file: {e}")
-            logger.info(
-                f"Posted propaganda poster to channel {channel.name}")
+                logger.error(f"Failed to broadcast poster to channel {channel.name}: {e}")
+                return False
+            return True
+
+    sent = await gather(*(send_copy(channel) for channel in remaining))
+    logger.info(f"Broadcast propaganda poster to {sum(sent)}/{len(remaining)} more channels")
+
+
+async def __report_generation_error(channel, e: Exception) -> None:
+    error_msg = f"Error generating propaganda poster: {str(e)}"
+    logger.error(error_msg, exc_info=e)
+
+    # Create detailed error messages for poster generation
+    error_str = str(e).lower()
+    if "rate limit" in error_str or "429" in error_str:
+        user_message = "⌛ Rate limit reached. The bot will try again in a few minutes."
+    elif "api key" in error_str or "authentication" in error_str:
+        user_message = "🔑 API Key Error: Please check your WaveSpeed API token."
+    elif "timeout" in error_str:
+        user_message = "⏱️ Request timed out. The bot will try again shortly."
+    else:
+        # Log the unexpected error for debugging
+        logger.error(f"Unexpected error: {e}", exc_info=e)
+        user_message = f"❌ Error: {str(e)}\nPlease report this if the issue persists."
+
+    await channel.send(user_message)
 
+
+async def __archive_poster(bot, poster: Poster) -> None:
+    if not bot.poster_archive.config.enabled:
+        return
+    try:
+        await bot.poster_archive.store(poster)
     except Exception as e:
-        error_msg = f"Error generating propaganda poster: {str(e)}"
-        logger.error(error_msg, exc_info=True)
-
-        # Create detailed error messages for poster generation
-        error_str = str(e).lower()
-        if "rate limit" in error_str or "429" in error_str:
-            user_message = "⌛ Rate limit reached. The bot will try again in a few minutes."
-        elif "api key" in error_str or "authentication" in error_str:
-            user_message = "🔑 API Key Error: Please check your WaveSpeed API token."
-        elif "timeout" in error_str:
-            user_message = "⏱️ Request timed out. The bot will try again shortly."
-        else:
-            # Log the unexpected error for debugging
-            logger.error(f"Unexpected error: {e}", exc_info=True)
-            user_message = f"❌ Error: {str(e)}\nPlease report this if the issue persists."
+        logger.warning(f"Failed to archive poster: {e}")
+
+
+async def render_propaganda_poster(bot, api_tokens: list[str]) -> Poster:
+    """Generate a poster from the configured prompt without posting it."""
+    poster_text = bot.propaganda_config.text_prompt.strip()
+    if not poster_text:
+        raise ValueError("Failed to generate poster text")
 
-        await channel.send(user_message)
+    image = await __generate_poster_image(poster_text, api_tokens, bot.propaganda_config)
+    poster = Poster(image=image.getvalue(), prompt=poster_text, model=bot.propaganda_config.wavespeed_model,
+                    size=bot.propaganda_config.poster_size)
+    return await post_process_poster(poster, bot.propaganda_config.poster_caption,
+                                     bot.propaganda_config.post_processing)
 
 
-async def __generate_poster_image(text: str, api_tokens: list[str], max_retries: int = 3) -> str:
+async def take_poster(bot, api_tokens: list[str]) -> Poster:
+    """Serve a pre-rendered poster from the reservoir, generating one on the spot when it is empty."""
+    if poster := bot.poster_reservoir.pop(bot.propaganda_config.text_prompt.strip()):
+        logger.info("Serving poster from reservoir")
+        return poster
+    return await render_propaganda_poster(bot, api_tokens)
+
+
+async def __generate_poster_image(text: str, api_tokens: list[str], config: PropagandaConfig) -> BytesIO:
+    """Race the tokens: every time the newest attempt fails or runs past its hedge delay, start the next token.
+
+    The first attempt to finish wins and the rest are cancelled.
+    """
     if not api_tokens:
         raise ValueError("No WaveSpeed tokens found")
 
+    token_pool = get_token_pool()
+    pending_tokens = token_pool.order(api_tokens)
+    if not pending_tokens:
+        raise Exception("All WaveSpeed tokens are rate limited or failing, try again later")
+
+    running: dict[Task, str] = {}
+    hedge_delay = None
     last_error = None
     async with ClientSession() as session:
-        for token in api_tokens:
-            try:
-                result_json, headers = await __post_image_generation_prompt(text, session, token)
-                result_url = result_json['data']['urls']['get']
-                image_url = await __poll_for_image(max_retries, session, result_url, headers)
-                return await __download_image(session, image_url)
+        try:
+            while pending_tokens or running:
+                if pending_tokens:
+                    token = pending_tokens.pop(0)
+                    task = create_task(__generate_with_token(text, session, token, config))
+                    running[task] = token
+                    hedge_delay = token_pool.hedge_delay(
+                        token, config.hedge_latency_percentile, config.hedge_default_delay)
 
-            except Exception as e:
-                last_error = str(e)
-                logger.warning(f"Token failed, trying next token. Error: {e}")
+                done, _ = await wait(running, timeout=hedge_delay if pending_tokens else None,
+                                     return_when=FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"Token attempt exceeded {hedge_delay:.1f}s, hedging onto the next token")
+                    continue
+
+                for task in done:
+                    running.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = str(e)
+                        logger.warning(f"Token failed, trying next token. Error: {e}")
+        finally:
+            for task in running:
+                task.cancel()
+            await gather(*running, return_exceptions=True)
 
     logger.error(f"All tokens failed. Last error: {last_error}")
     raise Exception(f"All tokens failed. Last error: {last_error}")
 
 
-async def __post_image_generation_prompt(text: str, session: ClientSession, token: str):
+async def __generate_with_token(text: str, session: ClientSession, token: str, config: PropagandaConfig) -> BytesIO:
+    token_pool = get_token_pool()
+    token_pool.acquire(token)
+    started_at = monotonic()
+    try:
+        result_json, headers = await __post_image_generation_prompt(text, session, token, config)
+        result_url = result_json['data']['urls']['get']
+        image_output = await __poll_for_image(session, result_url, headers, config)
+        image = await __read_image_output(session, image_output)
+    except CancelledError:
+        token_pool.release(token)
+        raise
+    except WaveSpeedError as e:
+        token_pool.release(token, failed=True, status=e.status, retry_after=e.retry_after)
+        raise
+    except Exception:
+        token_pool.release(token, failed=True)
+        raise
+
+    token_pool.release(token, latency=monotonic() - started_at)
+    return image
+
+
+async def __post_image_generation_prompt(text: str, session: ClientSession, token: str, config: PropagandaConfig):
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {token}"
@@ -104,43 +268,44 @@ async def __post_image_generation_prompt(text: str, session: ClientSession, toke
         "enable_safety_checker": True,
         "prompt": text,
         "seed": -1,
-        "size": "768*1152"
+        "size": config.poster_size
     }
     async with session.post(
-            'https://api.wavespeed.ai/api/v2/wavespeed-ai/hidream-i1-full',
+            f'https://api.wavespeed.ai/api/v2/{config.wavespeed_model}',
             headers=headers,
             json=data
     ) as resp:
+        get_token_pool().record_quota(token, resp.headers.get('X-RateLimit-Remaining'))
         if resp.status != 200:
-            raise Exception(f"Failed to create image: {await resp.text()}")
+            retry_after = resp.headers.get('Retry-After')
+            raise WaveSpeedError(f"Failed to create image ({resp.status}): {await resp.text()}", resp.status,
+                                 retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
         return await resp.json(), headers
 
 
-async def __poll_for_image(max_retries: int, session: ClientSession, url: str, headers: dict):
-    for _ in range(max_retries):
-        async with session.get(url, headers=headers) as resp:
-            if resp.status != 200:
-                raise Exception(f"Failed to get result: {await resp.text()}")
-
-            result_data = await resp.json()
-            status = result_data['data']['status']
+async def __poll_for_image(session: ClientSession, url: str, headers: dict, config: PropagandaConfig):
+    return await get_job_poller().wait_for_output(
+        session, url, headers,
+        job_key=f"{config.wavespeed_model}:{config.poster_size}",
+        timeout=config.generation_timeout,
+        max_errors=config.max_retries)
 
-            if status == 'completed':
-                return result_data['data']['outputs'][0]
 
-            elif status == 'failed':
-                raise Exception(f"Image generation failed: {result_data['data'].get('error', 'Unknown error')}")
-        await sleep(30)
+async def __read_image_output(session: ClientSession, output: str) -> BytesIO:
+    """Decode the base64 job output, falling back to streaming the download when a URL is returned."""
+    if output.startswith(('http://', 'https://')):
+        return await __download_image(session, output)
 
-    raise Exception("Image generation timed out")
+    _, _, encoded = output.rpartition('base64,')
+    return BytesIO(b64decode(encoded))
 
 
-async def __download_image(session: ClientSession, url: str):
+async def __download_image(session: ClientSession, url: str) -> BytesIO:
     async with session.get(url) as resp:
         if resp.status != 200:
             raise Exception("Failed to download generated image")
-        content = await resp.read()
-        temp_path = f"temp_poster_{os.getpid()}.jpg"
-        with open(temp_path, 'wb') as f:
-            f.write(content)
-        return temp_path
+        image = BytesIO()
+        async for chunk in resp.content.iter_chunked(64 * 1024):
+            image.write(chunk)
+        image.seek(0)
+        return image
@@ -0,0 +1,133 @@
+from asyncio import Event, Future, Task, create_task, get_running_loop
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from discord_bot.models.propaganda_config import GenerationQueueConfig
+
+logger = getLogger(__name__)
+
+
+class GenerationQueueFull(Exception):
+    pass
+
+
+@dataclass(eq=False)
+class GenerationJob:
+    key: str
+    guild_id: Optional[int]
+    user_id: Optional[int]
+    factory: Callable[[], Awaitable[Any]]
+    result: Future
+    started: Event = field(default_factory=Event)
+
+
+@dataclass
+class GenerationTicket:
+    job: GenerationJob
+    position: int
+    # The request joined an identical job that was already queued or running
+    joined: bool
+
+    @property
+    def started(self) -> Event:
+        return self.job.started
+
+    @property
+    def result(self) -> Future:
+        return self.job.result
+
+
+class GenerationQueue:
+    """Caps concurrent poster generations and serves waiting requests round-robin per guild, then per user.
+
+    Identical requests (same key) that are queued or running share a single job.
+    """
+
+    def __init__(self, config: GenerationQueueConfig):
+        self.config = config
+        self._pending: OrderedDict[Optional[int], OrderedDict[Optional[int], deque[GenerationJob]]] = OrderedDict()
+        self._jobs_by_key: dict[str, GenerationJob] = {}
+        self._running: set[Task] = set()
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(jobs) for users in self._pending.values() for jobs in users.values())
+
+    def submit(self, key: str, guild_id: Optional[int], user_id: Optional[int],
+               factory: Callable[[], Awaitable[Any]]) -> GenerationTicket:
+        """Queue a generation, or join the identical one already queued or running."""
+        if job := self._jobs_by_key.get(key):
+            return GenerationTicket(job, self._position(job), joined=True)
+
+        user_jobs = self._pending.get(guild_id, {}).get(user_id, ())
+        if len(user_jobs) >= self.config.max_pending_per_user:
+            raise GenerationQueueFull("You already have posters waiting in the queue")
+        if self.pending_count >= self.config.max_pending:
+            raise GenerationQueueFull("The poster queue is full, try again later")
+
+        job = GenerationJob(key=key, guild_id=guild_id, user_id=user_id, factory=factory,
+                            result=get_running_loop().create_future())
+        self._jobs_by_key[key] = job
+        self._pending.setdefault(guild_id, OrderedDict()).setdefault(user_id, deque()).append(job)
+        self._dispatch()
+        return GenerationTicket(job, self._position(job), joined=False)
+
+    def _fair_order(self) -> Iterator[GenerationJob]:
+        """The order pending jobs will be dispatched in, without consuming them."""
+        guilds = deque((guild_id, deque((user_id, deque(jobs)) for user_id, jobs in users.items()))
+                       for guild_id, users in self._pending.items())
+        while guilds:
+            guild_id, users = guilds.popleft()
+            user_id, jobs = users.popleft()
+            yield jobs.popleft()
+            if jobs:
+                users.append((user_id, jobs))
+            if users:
+                guilds.append((guild_id, users))
+
+    def _position(self, job: GenerationJob) -> int:
+        """0 when the job is already running, otherwise its 1-based place in line."""
+        if job.started.is_set():
+            return 0
+        for position, pending_job in enumerate(self._fair_order(), start=1):
+            if pending_job is job:
+                return position
+        return 0
+
+    def _next_job(self) -> GenerationJob:
+        guild_id, users = next(iter(self._pending.items()))
+        user_id, jobs = next(iter(users.items()))
+        job = jobs.popleft()
+
+        if jobs:
+            users.move_to_end(user_id)
+        else:
+            del users[user_id]
+        if users:
+            self._pending.move_to_end(guild_id)
+        else:
+            del self._pending[guild_id]
+        return job
+
+    def _dispatch(self) -> None:
+        while self._pending and len(self._running) < self.config.max_concurrency:
+            job = self._next_job()
+            job.started.set()
+            task = create_task(self._run(job))
+            self._running.add(task)
+            task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: Task) -> None:
+        self._running.discard(task)
+        self._dispatch()
+
+    async def _run(self, job: GenerationJob):
+        logger.info(f"Generating poster for guild {job.guild_id} ({self.pending_count} queued)")
+        try:
+            job.result.set_result(await job.factory())
+        except Exception as e:
+            job.result.set_exception(e)
+        finally:
+            self._jobs_by_key.pop(job.key, None)
@@ -0,0 +1,141 @@
+import heapq
+import random
+from asyncio import Event, Future, Task, TimeoutError, create_task, get_running_loop, wait_for
+from dataclasses import dataclass, field
+from functools import cache
+from itertools import count
+from logging import getLogger
+from time import monotonic
+from typing import Optional
+
+from aiohttp import ClientSession
+
+logger = getLogger(__name__)
+
+INITIAL_POLL_DELAY = 2.0
+MAX_POLL_DELAY = 15.0
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.2
+EXPECTED_FINISH_SMOOTHING = 0.3
+EXPECTED_FINISH_LEAD = 0.8
+
+
+@dataclass
+class _PolledJob:
+    session: ClientSession
+    url: str
+    headers: dict
+    job_key: str
+    started_at: float
+    deadline: float
+    max_errors: int
+    future: Future
+    delay: float = INITIAL_POLL_DELAY
+    errors: int = field(default=0)
+
+
+class JobPoller:
+    """Polls every in-flight WaveSpeed job from a single timer task instead of one sleep loop per job.
+
+    Typical completion times are learned per job key (model and size) so the first
+    status check lands close to the expected finish, then backs off with jitter until the deadline.
+    """
+
+    def __init__(self):
+        self._timers: list[tuple[float, int, _PolledJob]] = []
+        self._sequence = count()
+        self._wakeup = Event()
+        self._runner: Optional[Task] = None
+        self._checks: set[Task] = set()
+        self._expected_finish: dict[str, float] = {}
+
+    async def wait_for_output(self, session: ClientSession, url: str, headers: dict, job_key: str,
+                              timeout: float, max_errors: int = 3) -> str:
+        now = monotonic()
+        job = _PolledJob(session=session, url=url, headers=headers, job_key=job_key, started_at=now,
+                         deadline=now + timeout, max_errors=max_errors,
+                         future=get_running_loop().create_future())
+
+        expected = self._expected_finish.get(job_key)
+        first_delay = max(INITIAL_POLL_DELAY, expected * EXPECTED_FINISH_LEAD) if expected else INITIAL_POLL_DELAY
+        self._schedule(job, first_delay)
+        return await job.future
+
+    def _schedule(self, job: _PolledJob, delay: float) -> None:
+        due_at = min(monotonic() + delay, job.deadline)
+        heapq.heappush(self._timers, (due_at, next(self._sequence), job))
+        self._wakeup.set()
+        if self._runner is None or self._runner.done():
+            self._runner = create_task(self._run())
+
+    async def _run(self):
+        while self._timers:
+            self._wakeup.clear()
+            timeout = self._timers[0][0] - monotonic()
+            if timeout > 0:
+                try:
+                    await wait_for(self._wakeup.wait(), timeout)
+                    continue
+                except TimeoutError:
+                    pass
+
+            now = monotonic()
+            while self._timers and self._timers[0][0] <= now:
+                _, _, job = heapq.heappop(self._timers)
+                if job.future.done():
+                    continue
+                check = create_task(self._check(job))
+                self._checks.add(check)
+                check.add_done_callback(self._checks.discard)
+
+    async def _check(self, job: _PolledJob):
+        try:
+            async with job.session.get(job.url, headers=job.headers) as resp:
+                if resp.status != 200:
+                    raise Exception(f"Failed to get result: {await resp.text()}")
+                result_data = await resp.json()
+        except Exception as e:
+            job.errors += 1
+            if job.errors >= job.max_errors:
+                self._finish(job, exception=e)
+                return
+            logger.warning(f"Status check failed ({job.errors}/{job.max_errors}), retrying. Error: {e}")
+            self._reschedule(job)
+            return
+
+        status = result_data['data']['status']
+        if status == 'completed':
+            self._record_finish(job.job_key, monotonic() - job.started_at)
+            self._finish(job, result=result_data['data']['outputs'][0])
+        elif status == 'failed':
+            self._finish(job, exception=Exception(
+                f"Image generation failed: {result_data['data'].get('error', 'Unknown error')}"))
+        else:
+            self._reschedule(job)
+
+    def _reschedule(self, job: _PolledJob) -> None:
+        if monotonic() >= job.deadline:
+            self._finish(job, exception=Exception("Image generation timed out"))
+            return
+
+        job.delay = min(job.delay * POLL_BACKOFF, MAX_POLL_DELAY)
+        self._schedule(job, job.delay * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER))
+
+    def _record_finish(self, job_key: str, elapsed: float) -> None:
+        previous = self._expected_finish.get(job_key)
+        self._expected_finish[job_key] = elapsed if previous is None else (
+                EXPECTED_FINISH_SMOOTHING * elapsed + (1 - EXPECTED_FINISH_SMOOTHING) * previous)
+
+    @staticmethod
+    def _finish(job: _PolledJob, result: str = None, exception: Exception = None) -> None:
+        if job.future.done():
+            return
+        if exception is not None:
+            job.future.set_exception(exception)
+        else:
+            job.future.set_result(result)
+
+
+@cache
+def get_job_poller() -> JobPoller:
+    return JobPoller()
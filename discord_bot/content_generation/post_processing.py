@@ -0,0 +1,96 @@
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from io import BytesIO
+from logging import getLogger
+from time import perf_counter
+
+from PIL import Image, ImageDraw, ImageFont
+
+from discord_bot.models.poster import Poster
+from discord_bot.models.propaganda_config import PosterPostProcessingConfig
+
+logger = getLogger(__name__)
+
+MAX_DOWNSCALE_STEPS = 4
+DOWNSCALE_FACTOR = 0.75
+FILE_EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp", "PNG": "png"}
+
+
+@cache
+def get_post_processing_executor(max_workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="poster-post-processing")
+
+
+async def post_process_poster(poster: Poster, caption: str, config: PosterPostProcessingConfig) -> Poster:
+    """Fit the poster to Discord's upload limit (resize, watermark, re-encode) on a worker thread."""
+    executor = get_post_processing_executor(config.max_workers)
+    image, extension, timings = await get_running_loop().run_in_executor(
+        executor, _process_image, poster.image, caption, config)
+
+    if timings:
+        stage_timings = ", ".join(f"{stage}={elapsed * 1000:.0f}ms" for stage, elapsed in timings.items())
+        logger.info(f"Post-processed poster ({len(poster.image)} -> {len(image)} bytes) in {stage_timings}")
+    return poster.model_copy(update={"image": image, "filename": f"propaganda_poster.{extension}"})
+
+
+def _process_image(image_bytes: bytes, caption: str,
+                   config: PosterPostProcessingConfig) -> tuple[bytes, str, dict[str, float]]:
+    timings = {}
+
+    # Opening only parses the header, so images that already fit are passed through without decoding
+    image = Image.open(BytesIO(image_bytes))
+    needs_resize = config.max_dimension is not None and max(image.size) > config.max_dimension
+    needs_watermark = config.watermark_caption and bool(caption)
+    if not needs_resize and not needs_watermark and len(image_bytes) <= config.max_upload_bytes:
+        return image_bytes, FILE_EXTENSIONS.get(image.format, "jpg"), timings
+
+    started = perf_counter()
+    image.load()
+    timings["decode"] = perf_counter() - started
+
+    if needs_resize:
+        started = perf_counter()
+        image.thumbnail((config.max_dimension, config.max_dimension), Image.Resampling.LANCZOS)
+        timings["resize"] = perf_counter() - started
+
+    if needs_watermark:
+        started = perf_counter()
+        image = _add_watermark(image, caption)
+        timings["watermark"] = perf_counter() - started
+
+    started = perf_counter()
+    encoded = _encode_within_limit(image.convert("RGB"), config)
+    timings["encode"] = perf_counter() - started
+    return encoded, FILE_EXTENSIONS[config.output_format], timings
+
+
+def _encode_within_limit(image: Image.Image, config: PosterPostProcessingConfig) -> bytes:
+    """Walk the quality ladder, then downscale and walk it again until the image fits the upload limit."""
+    for _ in range(MAX_DOWNSCALE_STEPS + 1):
+        for quality in config.quality_ladder:
+            buffer = BytesIO()
+            image.save(buffer, format=config.output_format, quality=quality)
+            if buffer.tell() <= config.max_upload_bytes:
+                return buffer.getvalue()
+
+        image = image.resize((int(image.width * DOWNSCALE_FACTOR), int(image.height * DOWNSCALE_FACTOR)),
+                             Image.Resampling.LANCZOS)
+
+    raise ValueError(f"Poster could not be encoded under {config.max_upload_bytes} bytes")
+
+
+def _add_watermark(image: Image.Image, caption: str) -> Image.Image:
+    image = image.convert("RGBA")
+    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    font = ImageFont.load_default(size=max(16, image.height // 30))
+
+    left, top, right, bottom = draw.textbbox((0, 0), caption, font=font)
+    padding = font.size // 2
+    x = (image.width - (right - left)) // 2
+    y = image.height - (bottom - top) - 3 * padding
+    draw.rectangle((x - padding, y - padding, x + (right - left) + padding, y + (bottom - top) + 2 * padding),
+                   fill=(0, 0, 0, 140))
+    draw.text((x, y), caption, font=font, fill=(255, 255, 255, 230))
+    return Image.alpha_composite(image, overlay)
@@ -0,0 +1,126 @@
+import sqlite3
+from asyncio import to_thread
+from hashlib import sha256
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Optional
+
+from discord_bot.models.poster import Poster
+from discord_bot.models.propaganda_config import PosterArchiveConfig
+
+logger = getLogger(__name__)
+
+INDEX_FILENAME = "index.sqlite3"
+
+
+class PosterArchive:
+    """Content-addressed poster store: files in a directory, indexed in SQLite, evicted LRU by total bytes."""
+
+    def __init__(self, config: PosterArchiveConfig):
+        self.config = config
+        self._directory = Path(config.directory)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    @staticmethod
+    def archive_key(poster: Poster) -> str:
+        # Random-seed posters (-1) are addressed by their content, so each generation gets its own entry
+        seed = str(poster.seed) if poster.seed >= 0 else sha256(poster.image).hexdigest()
+        return sha256("\0".join((poster.prompt, poster.model, poster.size, seed)).encode()).hexdigest()
+
+    async def store(self, poster: Poster) -> str:
+        return await to_thread(self._store, poster)
+
+    async def load(self, key_prefix: str = None) -> Optional[Poster]:
+        """The archived poster whose key starts with `key_prefix`, or the newest one."""
+        return await to_thread(self._load, key_prefix)
+
+    async def recent(self, limit: int = 10) -> list[tuple[str, str, float]]:
+        return await to_thread(self._recent, limit)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self._directory / INDEX_FILENAME, check_same_thread=False)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS posters (
+                    key TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    size TEXT NOT NULL,
+                    seed INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS posters_last_access ON posters (last_access)")
+        return self._connection
+
+    def _store(self, poster: Poster) -> str:
+        key = self.archive_key(poster)
+        path = self._directory / f"{key}{Path(poster.filename).suffix}"
+        with self._lock:
+            connection = self._connect()
+            if not path.exists():
+                path.write_bytes(poster.image)
+            with connection:
+                connection.execute(
+                    "INSERT INTO posters VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET last_access = excluded.last_access",
+                    (key, path.name, poster.prompt, poster.model, poster.size, poster.seed, len(poster.image),
+                     poster.created_at, time()))
+            self._evict(connection)
+        logger.info(f"Archived poster {key[:12]}")
+        return key
+
+    def _load(self, key_prefix: Optional[str]) -> Optional[Poster]:
+        with self._lock:
+            connection = self._connect()
+            if key_prefix:
+                row = connection.execute(
+                    "SELECT key, filename, prompt, model, size, seed, created_at FROM posters "
+                    "WHERE substr(key, 1, ?) = ? LIMIT 1", (len(key_prefix), key_prefix.lower())).fetchone()
+            else:
+                row = connection.execute(
+                    "SELECT key, filename, prompt, model, size, seed, created_at FROM posters "
+                    "ORDER BY created_at DESC LIMIT 1").fetchone()
+            if row is None:
+                return None
+
+            key, filename, prompt, model, size, seed, created_at = row
+            path = self._directory / filename
+            if not path.exists():
+                with connection:
+                    connection.execute("DELETE FROM posters WHERE key = ?", (key,))
+                return None
+            with connection:
+                connection.execute("UPDATE posters SET last_access = ? WHERE key = ?", (time(), key))
+
+        return Poster(image=path.read_bytes(), prompt=prompt, model=model, size=size, seed=seed,
+                      created_at=created_at, filename=f"propaganda_poster{path.suffix}")
+
+    def _recent(self, limit: int) -> list[tuple[str, str, float]]:
+        with self._lock:
+            return self._connect().execute(
+                "SELECT key, prompt, created_at FROM posters ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        total_bytes, = connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM posters").fetchone()
+        if total_bytes <= self.config.max_bytes:
+            return
+
+        evicted = []
+        for key, filename, entry_bytes in connection.execute(
+                "SELECT key, filename, bytes FROM posters ORDER BY last_access").fetchall():
+            if total_bytes <= self.config.max_bytes:
+                break
+            (self._directory / filename).unlink(missing_ok=True)
+            evicted.append((key,))
+            total_bytes -= entry_bytes
+
+        with connection:
+            connection.executemany("DELETE FROM posters WHERE key = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} posters from archive")
@@ -0,0 +1,96 @@
+from asyncio import Event, Task, TimeoutError, create_task, sleep, wait_for
+from collections import deque
+from logging import getLogger
+from time import time
+from typing import Optional
+
+from discord_bot.models.poster import Poster
+from discord_bot.models.propaganda_config import PosterReservoirConfig
+
+logger = getLogger(__name__)
+
+REFILL_RETRY_DELAY = 300
+
+
+class PosterReservoir:
+    """Bounded store of pre-rendered posters keyed by prompt, refilled by a background prefetcher."""
+
+    def __init__(self, config: PosterReservoirConfig):
+        self.config = config
+        self._posters: dict[str, deque[Poster]] = {}
+        self._last_used: dict[str, float] = {}
+        self._changed = Event()
+        self._prefetcher: Optional[Task] = None
+
+    def __len__(self):
+        return sum(len(posters) for posters in self._posters.values())
+
+    def start(self, bot, api_tokens: list[str]) -> None:
+        if not self.config.enabled or (self._prefetcher and not self._prefetcher.done()):
+            return
+        self._prefetcher = create_task(self._prefetch_loop(bot, api_tokens))
+        logger.info(f"Poster reservoir prefetcher started (size={self.config.size})")
+
+    def pop(self, prompt: str) -> Optional[Poster]:
+        self._evict_expired()
+        self._last_used[prompt] = time()
+        posters = self._posters.get(prompt)
+        if not posters:
+            return None
+
+        poster = posters.popleft()
+        if not posters:
+            del self._posters[prompt]
+        self._changed.set()
+        return poster
+
+    def add(self, poster: Poster) -> None:
+        self._evict_expired()
+        while len(self) >= self.config.size:
+            self._evict_one()
+        self._posters.setdefault(poster.prompt, deque()).append(poster)
+
+    def _evict_expired(self) -> None:
+        expires_before = time() - self.config.ttl_seconds
+        for prompt in list(self._posters):
+            posters = self._posters[prompt]
+            while posters and posters[0].created_at < expires_before:
+                posters.popleft()
+            if not posters:
+                del self._posters[prompt]
+
+    def _evict_one(self) -> None:
+        if self.config.eviction_policy == "lru":
+            prompt = min(self._posters, key=lambda p: self._last_used.get(p, 0))
+        else:
+            prompt = min(self._posters, key=lambda p: self._posters[p][0].created_at)
+
+        posters = self._posters[prompt]
+        posters.popleft()
+        if not posters:
+            del self._posters[prompt]
+
+    def _next_expiry(self) -> Optional[float]:
+        oldest = [posters[0].created_at for posters in self._posters.values()]
+        return min(oldest) + self.config.ttl_seconds - time() if oldest else None
+
+    async def _prefetch_loop(self, bot, api_tokens: list[str]):
+        from discord_bot.content_generation.generate_poster import render_propaganda_poster
+
+        while True:
+            self._evict_expired()
+            prompt = bot.propaganda_config.text_prompt.strip()
+            if len(self._posters.get(prompt, ())) < self.config.size:
+                try:
+                    self.add(await render_propaganda_poster(bot, api_tokens))
+                    logger.info(f"Prefetched poster into reservoir ({len(self)}/{self.config.size})")
+                except Exception as e:
+                    logger.warning(f"Poster prefetch failed, retrying in {REFILL_RETRY_DELAY}s. Error: {e}")
+                    await sleep(REFILL_RETRY_DELAY)
+                continue
+
+            self._changed.clear()
+            try:
+                await wait_for(self._changed.wait(), self._next_expiry())
+            except TimeoutError:
+                pass
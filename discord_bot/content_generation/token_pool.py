@@ -0,0 +1,145 @@
+from collections import deque
+from dataclasses import dataclass, field
+from functools import cache
+from itertools import count
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+from typing import Optional
+
+logger = getLogger(__name__)
+
+LATENCY_SAMPLE_SIZE = 50
+ERROR_WINDOW_SIZE = 20
+DEFAULT_RATE_LIMIT_COOLDOWN = 60
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_OPEN_SECONDS = 120
+MAX_CIRCUIT_OPEN_SECONDS = 1800
+
+
+@dataclass
+class TokenState:
+    in_flight: int = 0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLE_SIZE))
+    outcomes: deque[bool] = field(default_factory=lambda: deque(maxlen=ERROR_WINDOW_SIZE))
+    quota_remaining: Optional[int] = None
+    cooldown_until: float = 0
+    consecutive_failures: int = 0
+    circuit_open_until: float = 0
+    circuit_open_seconds: float = CIRCUIT_OPEN_SECONDS
+    last_used: int = 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def circuit(self) -> str:
+        if self.consecutive_failures < CIRCUIT_FAILURE_THRESHOLD:
+            return "closed"
+        return "open" if monotonic() < self.circuit_open_until else "half-open"
+
+    def available(self) -> bool:
+        if monotonic() < self.cooldown_until:
+            return False
+        circuit = self.circuit
+        return circuit == "closed" or (circuit == "half-open" and self.in_flight == 0)
+
+
+class TokenPool:
+    """Tracks load, latency, errors, rate limits and circuit state per WaveSpeed token.
+
+    The bot loop records outcomes while the API thread reads snapshots, so the sample windows are only
+    touched under a lock.
+    """
+
+    def __init__(self):
+        self._states: dict[str, TokenState] = {}
+        self._uses = count(1)
+        self._lock = Lock()
+
+    def state(self, token: str) -> TokenState:
+        return self._states.setdefault(token, TokenState())
+
+    def order(self, tokens: list[str]) -> list[str]:
+        """Available tokens, least loaded first; ties go to the least recently used (round-robin)."""
+        available = [token for token in tokens if self.state(token).available()]
+        return sorted(available, key=lambda token: (self.state(token).quota_remaining == 0,
+                                                    self.state(token).in_flight,
+                                                    round(self.state(token).error_rate, 1),
+                                                    self.state(token).last_used))
+
+    def acquire(self, token: str) -> None:
+        state = self.state(token)
+        state.in_flight += 1
+        state.last_used = next(self._uses)
+
+    def release(self, token: str, latency: float = None, failed: bool = False,
+                status: int = None, retry_after: float = None) -> None:
+        state = self.state(token)
+        state.in_flight -= 1
+
+        if status == 429:
+            state.cooldown_until = monotonic() + (retry_after or DEFAULT_RATE_LIMIT_COOLDOWN)
+            logger.warning(f"Token {mask_token(token)} rate limited, cooling down for "
+                           f"{retry_after or DEFAULT_RATE_LIMIT_COOLDOWN}s")
+            return
+
+        if latency is not None:
+            with self._lock:
+                state.latencies.append(latency)
+                state.outcomes.append(True)
+            state.consecutive_failures = 0
+            state.circuit_open_seconds = CIRCUIT_OPEN_SECONDS
+        elif failed:
+            with self._lock:
+                state.outcomes.append(False)
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                if state.consecutive_failures > CIRCUIT_FAILURE_THRESHOLD:
+                    state.circuit_open_seconds = min(state.circuit_open_seconds * 2, MAX_CIRCUIT_OPEN_SECONDS)
+                state.circuit_open_until = monotonic() + state.circuit_open_seconds
+                logger.warning(f"Circuit opened for token {mask_token(token)} "
+                               f"for {state.circuit_open_seconds}s")
+
+    def record_quota(self, token: str, remaining: Optional[str]) -> None:
+        if remaining is not None and remaining.isdigit():
+            self.state(token).quota_remaining = int(remaining)
+
+    def hedge_delay(self, token: str, percentile: float, default: float) -> float:
+        """How long to wait on `token` before hedging onto the next one."""
+        state = self.state(token)
+        with self._lock:
+            latencies = list(state.latencies)
+        if not latencies:
+            return default
+
+        ordered = sorted(latencies)
+        return ordered[round(percentile / 100 * (len(ordered) - 1))]
+
+    def snapshot(self) -> list[dict]:
+        """Per-token stats; safe to call from another thread than the one recording outcomes."""
+        now = monotonic()
+        snapshot = []
+        for token, state in list(self._states.items()):
+            with self._lock:
+                error_rate = state.error_rate
+            snapshot.append({
+                "token": mask_token(token),
+                "in_flight": state.in_flight,
+                "error_rate": round(error_rate, 2),
+                "p50_latency": round(self.hedge_delay(token, 50, 0), 1) or None,
+                "quota_remaining": state.quota_remaining,
+                "cooldown_remaining": max(0, round(state.cooldown_until - now)),
+                "circuit": state.circuit,
+            })
+        return snapshot
+
+
+def mask_token(token: str) -> str:
+    return f"...{token[-4:]}"
+
+
+@cache
+def get_token_pool() -> TokenPool:
+    return TokenPool()
@@ -0,0 +1,97 @@
+import asyncio
+import sqlite3
+from logging import getLogger
+from pathlib import Path
+from time import time
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from discord_bot.models.propaganda_config import PropagandaSchedulerConfig, PropagandaSchedulerTimeConfig
+
+logger = getLogger(__name__)
+
+
+class GuildConfig(BaseModel):
+    """One guild's schedule and channels; field names match PropagandaSchedulerConfig."""
+    guild_id: int
+    time: PropagandaSchedulerTimeConfig
+    timezone: str
+    catch_up_window: int = Field(ge=0, default=3 * 3600)
+    poster_output_channel_id: Optional[int] = None
+    poster_output_channel_ids: list[int] = Field(default_factory=list)
+    voice_channel_id: Optional[int] = None
+    youtube_playlist_url: Optional[str] = None
+
+
+class GuildConfigStore:
+    """Per-guild configuration rows in SQLite, all cached in memory by guild ID.
+
+    Reads are served from the cache and a change writes only the guild's own row, in a worker thread so the
+    commit does not block the event loop. Guilds without a row start from the global scheduler settings,
+    without any channels.
+    """
+
+    def __init__(self, path: str, defaults: PropagandaSchedulerConfig):
+        self.path = Path(path)
+        self.defaults = defaults
+        self._lock = asyncio.Lock()
+        self._connection = self._connect()
+        self._configs: dict[int, GuildConfig] = {
+            guild_id: GuildConfig.model_validate_json(config)
+            for guild_id, config in self._connection.execute("SELECT guild_id, config FROM guild_configs")}
+        logger.info(f"Loaded configuration for {len(self._configs)} guilds")
+
+    def get(self, guild_id: int) -> GuildConfig:
+        config = self._configs.get(guild_id)
+        if config is None:
+            config = GuildConfig(guild_id=guild_id, time=self.defaults.time.model_copy(),
+                                 timezone=self.defaults.timezone, catch_up_window=self.defaults.catch_up_window,
+                                 youtube_playlist_url=self.defaults.youtube_playlist_url)
+        return config
+
+    async def update(self, guild_id: int, **changes) -> GuildConfig:
+        # Changes to a guild are applied one at a time, so concurrent commands do not overwrite each other
+        async with self._lock:
+            config = self.get(guild_id).model_copy(update=changes)
+            await asyncio.to_thread(self._write, guild_id, config)
+            self._configs[guild_id] = config
+        return config
+
+    def for_channel(self, bot, channel_id: Optional[int]) -> Optional[GuildConfig]:
+        """The configuration of the guild a channel belongs to, or None while the bot cannot see it."""
+        channel = bot.get_channel(channel_id) if channel_id else None
+        return self.get(channel.guild.id) if channel else None
+
+    def all(self) -> list[GuildConfig]:
+        return list(self._configs.values())
+
+    async def seed_from_global(self, bot) -> None:
+        """Give the guild of the globally configured poster channel a row with the global settings, so an
+        existing single-guild setup keeps its schedule."""
+        channel = bot.get_channel(self.defaults.poster_output_channel_id)
+        if channel is None or channel.guild.id in self._configs:
+            return
+        await self.update(channel.guild.id,
+                          poster_output_channel_id=self.defaults.poster_output_channel_id,
+                          poster_output_channel_ids=list(self.defaults.poster_output_channel_ids),
+                          voice_channel_id=self.defaults.voice_channel_id)
+        logger.info(f"Seeded guild {channel.guild.id} configuration from the global settings")
+
+    def _write(self, guild_id: int, config: GuildConfig) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO guild_configs VALUES (?, ?, ?) ON CONFLICT (guild_id) DO UPDATE SET "
+                "config = excluded.config, updated_at = excluded.updated_at",
+                (guild_id, config.model_dump_json(), time()))
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS guild_configs (
+                guild_id INTEGER PRIMARY KEY,
+                config TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )""")
+        return connection
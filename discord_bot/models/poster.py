@@ -0,0 +1,13 @@
+from time import time
+
+from pydantic import BaseModel, Field
+
+
+class Poster(BaseModel):
+    image: bytes
+    prompt: str
+    model: str
+    size: str
+    seed: int = -1
+    filename: str = "propaganda_poster.jpg"
+    created_at: float = Field(default_factory=time)
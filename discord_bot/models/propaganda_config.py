@@ -1,8 +1,7 @@
 import os
 from functools import cache
-from json import dump
 from logging import getLogger
-from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic import Field, BaseModel
 from pydantic_settings import BaseSettings, PydanticBaseSettingsSource, JsonConfigSettingsSource
@@ -18,19 +17,124 @@ class PropagandaSchedulerTimeConfig(BaseModel):
 class PropagandaSchedulerConfig(BaseModel):
     time: PropagandaSchedulerTimeConfig
     timezone: str
+    catch_up_window: int = Field(ge=0, default=3 * 3600)
     poster_output_channel_id: int
+    poster_output_channel_ids: list[int] = Field(default_factory=list)
     voice_channel_id: int
     youtube_playlist_url: str
     steam_ids: list[int]
     cs2_alert_video_url: str
 
 
+class PosterReservoirConfig(BaseModel):
+    enabled: bool = False
+    size: int = Field(ge=1, le=20, default=2)
+    ttl_seconds: int = Field(ge=60, default=86400)
+    eviction_policy: Literal["oldest", "lru"] = "oldest"
+
+
+class GenerationQueueConfig(BaseModel):
+    max_concurrency: int = Field(ge=1, le=10, default=2)
+    max_pending: int = Field(ge=1, default=20)
+    max_pending_per_user: int = Field(ge=1, default=2)
+
+
+class PosterPostProcessingConfig(BaseModel):
+    max_upload_bytes: int = Field(ge=1024, default=8 * 1024 * 1024)
+    max_dimension: Optional[int] = Field(ge=64, default=None)
+    output_format: Literal["JPEG", "WEBP"] = "JPEG"
+    quality_ladder: list[int] = Field(min_length=1, default=[95, 85, 75, 65, 50])
+    watermark_caption: bool = False
+    max_workers: int = Field(ge=1, le=8, default=2)
+
+
+class PosterArchiveConfig(BaseModel):
+    enabled: bool = True
+    directory: str = "poster_archive"
+    max_bytes: int = Field(ge=1024 * 1024, default=256 * 1024 * 1024)
+
+
+class AudioCacheConfig(BaseModel):
+    enabled: bool = True
+    directory: str = "audio_cache"
+    max_bytes: int = Field(ge=1024 * 1024, default=512 * 1024 * 1024)
+    hot_track_threshold: int = Field(ge=1, default=3)
+    warm_urls: list[str] = Field(default_factory=list)
+
+
+class GameAlertRule(BaseModel):
+    game_id: str
+    name: str
+    # When set, the rule only applies to these players and overrides the game's general rule for them
+    steam_ids: list[int] = Field(default_factory=list)
+    voice_channel_id: Optional[int] = None
+    video_url: Optional[str] = None
+    started_message: Optional[str] = "🚨 {players} just launched {game}!"
+    stopped_message: Optional[str] = None
+
+
+class SteamPollIntervals(BaseModel):
+    """Seconds between polls of a player in each presence tier."""
+    in_game: float = Field(gt=0, default=15)
+    online: float = Field(gt=0, default=30)
+    away: float = Field(gt=0, default=60)
+    recently_offline: float = Field(gt=0, default=120)
+    dormant: float = Field(gt=0, default=600)
+
+
+class SteamMonitorConfig(BaseModel):
+    poll_intervals: SteamPollIntervals = Field(default_factory=SteamPollIntervals)
+    recently_offline_window: int = Field(ge=0, default=3600)
+    quiet_hours_start: int = Field(ge=0, lt=24, default=2)
+    quiet_hours_end: int = Field(ge=0, lt=24, default=8)
+    quiet_hours_multiplier: float = Field(ge=1, default=2)
+    retry_interval: int = Field(ge=1, default=10)
+    alert_debounce_seconds: int = Field(ge=0, default=600)
+    alert_coalesce_window: float = Field(ge=0, default=5)
+    game_rules: list[GameAlertRule] = Field(default_factory=list)
+    history_file: str = "presence_history.json"
+    history_capacity: int = Field(ge=16, default=512)
+    history_snapshot_interval: int = Field(ge=10, default=300)
+
+
+class DailyStageTimeouts(BaseModel):
+    """Seconds each stage of the daily run may take before it is abandoned."""
+    poster: float = Field(gt=0, default=900)
+    # Longer than discord.py's 60 second connect() timeout, so a slow handshake fails on its own and is
+    # cleaned up instead of being cancelled halfway
+    voice: float = Field(gt=0, default=90)
+    track: float = Field(gt=0, default=60)
+    speech: float = Field(gt=0, default=1800)
+
+    def total(self) -> float:
+        """Longest a whole daily run can take, with the poster running alongside the speech stages."""
+        return max(self.poster, max(self.voice, self.track) + self.speech)
+
+
 class PropagandaConfig(BaseSettings):
     propaganda_scheduler: PropagandaSchedulerConfig
     text_prompt: str = Field(
         default="Generate a short, inspiring slogan for a propaganda poster about technology and progress")
     poster_caption: str = Field(default="A True Malborian Culture Piece:")
     max_retries: int = Field(ge=1, le=10, default=3)
+    generation_timeout: int = Field(ge=10, default=180)
+    poster_variants: int = Field(ge=1, le=10, default=1)
+    variant_concurrency: int = Field(ge=1, le=10, default=2)
+    broadcast_concurrency: int = Field(ge=1, le=50, default=5)
+    voice_idle_timeout: int = Field(ge=0, default=300)
+    wavespeed_model: str = Field(default="wavespeed-ai/hidream-i1-full")
+    poster_size: str = Field(default="768*1152")
+    hedge_latency_percentile: float = Field(gt=0, le=100, default=90)
+    hedge_default_delay: int = Field(ge=1, default=60)
+    poster_reservoir: PosterReservoirConfig = Field(default_factory=PosterReservoirConfig)
+    generation_queue: GenerationQueueConfig = Field(default_factory=GenerationQueueConfig)
+    post_processing: PosterPostProcessingConfig = Field(default_factory=PosterPostProcessingConfig)
+    poster_archive: PosterArchiveConfig = Field(default_factory=PosterArchiveConfig)
+    audio_cache: AudioCacheConfig = Field(default_factory=AudioCacheConfig)
+    steam_monitor: SteamMonitorConfig = Field(default_factory=SteamMonitorConfig)
+    scheduler_database: str = Field(default="scheduler.sqlite3")
+    guild_config_database: str = Field(default="guild_configs.sqlite3")
+    daily_stage_timeouts: DailyStageTimeouts = Field(default_factory=DailyStageTimeouts)
     steam_api_key: str
 
     @classmethod
@@ -48,12 +152,6 @@ class PropagandaConfig(BaseSettings):
         return (JsonConfigSettingsSource(settings_cls, json_file=config_path),)
 
 
-def save_settings_to_file(settings: PropagandaConfig, path: str | Path = os.getenv("PROPAGANDA_CONFIG_PATH")) -> None:
-    path = Path(path)
-    with path.open("w", encoding="utf-8") as f:
-        dump(settings.model_dump(), f, indent=4)
-
-
 @cache
 def get_propaganda_config(*args, **kwargs):
     return PropagandaConfig(*args, **kwargs)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Optional
+
+import yt_dlp
+
+from discord_bot.models.propaganda_config import AudioCacheConfig
+from discord_bot.music_player.track_cache import ResolvedTrack
+
+logger = getLogger(__name__)
+
+INDEX_FILENAME = "index.json"
+DOWNLOAD_CONCURRENCY = 2
+
+
+@dataclass
+class CachedClip:
+    video_id: str
+    url: str
+    title: str
+    filename: str
+    size: int
+
+
+class AudioCache:
+    """On-disk cache of clips pre-transcoded to Ogg/Opus, so playback is a codec copy with no probe or re-encode.
+
+    Configured clips are downloaded at startup and tracks are cached once they have been played often enough.
+    The least recently played clips are evicted to stay within the byte budget.
+    """
+
+    def __init__(self, config: AudioCacheConfig):
+        self.config = config
+        self._directory = Path(config.directory)
+        self._clips: OrderedDict[str, CachedClip] = OrderedDict()
+        self._video_ids_by_url: dict[str, str] = {}
+        self._play_counts: Counter[str] = Counter()
+        self._downloads: dict[str, asyncio.Task] = {}
+        self._download_slots = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+        self._index_lock = asyncio.Lock()
+        self._load_index()
+
+    def cached_track(self, url: str) -> Optional[ResolvedTrack]:
+        """A playable track for `url` straight from disk, without any network lookup."""
+        video_id = self._video_ids_by_url.get(url)
+        return self._local_track(video_id) if video_id else None
+
+    def path_for(self, video_id: Optional[str]) -> Optional[Path]:
+        clip = self._clips.get(video_id)
+        if clip is None:
+            return None
+        self._clips.move_to_end(video_id)
+        return self._directory / clip.filename
+
+    def record_play(self, track: ResolvedTrack) -> None:
+        """Count a play and start caching the track once it becomes hot."""
+        if not self.config.enabled or not track.video_id or track.video_id in self._clips:
+            return
+        self._play_counts[track.video_id] += 1
+        if self._play_counts[track.video_id] >= self.config.hot_track_threshold:
+            self.cache(track.url)
+
+    def cache(self, url: str) -> asyncio.Task:
+        if url not in self._downloads:
+            task = asyncio.create_task(self._download(url))
+            self._downloads[url] = task
+            task.add_done_callback(lambda _: self._downloads.pop(url, None))
+        return self._downloads[url]
+
+    async def warm_up(self, urls: list[str]) -> None:
+        if not self.config.enabled:
+            return
+        urls = [url for url in dict.fromkeys(urls) if url and url not in self._video_ids_by_url]
+        await asyncio.gather(*(self.cache(url) for url in urls), return_exceptions=True)
+        logger.info(f"Audio cache warmed up ({len(self._clips)} clips, {self._total_bytes()} bytes)")
+
+    def _local_track(self, video_id: str) -> ResolvedTrack:
+        clip = self._clips[video_id]
+        return ResolvedTrack(url=clip.url, video_id=video_id, title=clip.title,
+                             stream_url=str(self._directory / clip.filename), expires_at=float('inf'))
+
+    async def _download(self, url: str):
+        async with self._download_slots:
+            try:
+                clip = await asyncio.to_thread(self._download_clip, url)
+            except Exception as e:
+                logger.warning(f"Failed to cache audio for {url}: {e}")
+                return
+
+        self._clips[clip.video_id] = clip
+        self._video_ids_by_url[url] = clip.video_id
+        self._video_ids_by_url[clip.url] = clip.video_id
+        self._evict()
+        await self._save_index()
+        logger.info(f"Cached audio clip {clip.title} ({clip.size} bytes)")
+
+    def _download_clip(self, url: str) -> CachedClip:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        options = {
+            'format': 'bestaudio/best',
+            'quiet': True,
+            'no_warnings': True,
+            'noplaylist': True,
+            'outtmpl': str(self._directory / '%(id)s.%(ext)s'),
+            # Opus sources are remuxed into Ogg as they are; anything else is transcoded once here
+            'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'opus'}],
+        }
+        with yt_dlp.YoutubeDL(options) as ydl:
+            info = ydl.extract_info(url, download=True)
+
+        path = self._directory / f"{info['id']}.opus"
+        return CachedClip(video_id=info['id'], url=info.get('webpage_url', url), title=info.get('title', 'Unknown'),
+                          filename=path.name, size=path.stat().st_size)
+
+    def _total_bytes(self) -> int:
+        return sum(clip.size for clip in self._clips.values())
+
+    def _evict(self) -> None:
+        total_bytes = self._total_bytes()
+        while total_bytes > self.config.max_bytes and len(self._clips) > 1:
+            video_id, clip = self._clips.popitem(last=False)
+            (self._directory / clip.filename).unlink(missing_ok=True)
+            self._video_ids_by_url = {url: cached_id for url, cached_id in self._video_ids_by_url.items()
+                                      if cached_id != video_id}
+            total_bytes -= clip.size
+            logger.info(f"Evicted audio clip {clip.title} from cache")
+
+    def _load_index(self) -> None:
+        index_path = self._directory / INDEX_FILENAME
+        if not index_path.exists():
+            return
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable audio cache index: {e}")
+            return
+
+        for entry in index["clips"]:
+            clip = CachedClip(**entry)
+            if (self._directory / clip.filename).exists():
+                self._clips[clip.video_id] = clip
+        self._video_ids_by_url = {url: video_id for url, video_id in index["urls"].items() if video_id in self._clips}
+
+    async def _save_index(self) -> None:
+        # Serialized on the event loop, where the clips change, and written in a worker thread one at a time
+        async with self._index_lock:
+            index = {"clips": [asdict(clip) for clip in self._clips.values()], "urls": self._video_ids_by_url}
+            await asyncio.to_thread((self._directory / INDEX_FILENAME).write_text, json.dumps(index),
+                                    encoding="utf-8")
@@ -0,0 +1,55 @@
+from asyncio import TimeoutError, get_running_loop, wait_for
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from logging import getLogger
+from threading import local
+
+import yt_dlp
+
+logger = getLogger(__name__)
+
+EXTRACTION_WORKERS = 2
+EXTRACTION_TIMEOUT = 30
+
+YDL_OPTIONS = {
+    'format': 'bestaudio/best',
+    'quiet': True,
+    'no_warnings': True,
+}
+
+
+class ExtractionService:
+    """Runs yt-dlp lookups on a bounded worker pool so a slow extraction never stalls the event loop.
+
+    Every worker thread keeps its own warmed `YoutubeDL` instances, since they are not thread-safe.
+    A timed out or cancelled lookup stops being awaited, but a thread already running it finishes in the background.
+    """
+
+    def __init__(self, max_workers: int = EXTRACTION_WORKERS, timeout: float = EXTRACTION_TIMEOUT):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yt-dlp")
+        self._downloaders = local()
+        self._timeout = timeout
+
+    async def extract(self, url: str, flat: bool = True, timeout: float = None) -> dict:
+        """Extract info for `url`; `flat` lists playlist entries without resolving each one."""
+        future = get_running_loop().run_in_executor(self._executor, self._extract, url, flat)
+        try:
+            return await wait_for(future, timeout or self._timeout)
+        except TimeoutError:
+            raise TimeoutError(f"yt-dlp extraction timed out for {url}") from None
+
+    def _downloader(self, flat: bool) -> yt_dlp.YoutubeDL:
+        if not hasattr(self._downloaders, 'by_flat'):
+            self._downloaders.by_flat = {}
+        downloaders = self._downloaders.by_flat
+        if flat not in downloaders:
+            downloaders[flat] = yt_dlp.YoutubeDL({**YDL_OPTIONS, 'extract_flat': flat})
+        return downloaders[flat]
+
+    def _extract(self, url: str, flat: bool) -> dict:
+        return self._downloader(flat).extract_info(url, download=False)
+
+
+@cache
+def get_extraction_service() -> ExtractionService:
+    return ExtractionService()
@@ -0,0 +1,99 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Awaitable, Callable, Optional
+
+import discord
+
+from discord_bot.music_player.probe_cache import get_probe_cache
+from discord_bot.music_player.track_cache import ResolvedTrack
+
+logger = getLogger(__name__)
+
+FFMPEG_BEFORE_OPTIONS = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5"
+
+SourceFactory = Callable[[ResolvedTrack], Awaitable[discord.AudioSource]]
+
+
+async def probe_source(track: ResolvedTrack) -> discord.AudioSource:
+    return await get_probe_cache().create_source(track, before_options=FFMPEG_BEFORE_OPTIONS)
+
+
+@dataclass(eq=False)
+class QueuedTrack:
+    track: ResolvedTrack
+    requested_by: Optional[str]
+    # Resolves to None once the track finished, or to the error that stopped it
+    finished: asyncio.Future
+
+
+class GuildPlayer:
+    """Plays one guild's track queue, advancing from the voice client's completion callback instead of polling."""
+
+    def __init__(self, guild_id: int, voice_client: discord.VoiceClient, source_factory: SourceFactory = probe_source):
+        self.guild_id = guild_id
+        self.voice_client = voice_client
+        self.source_factory = source_factory
+        self.queue: deque[QueuedTrack] = deque()
+        self.now_playing: Optional[QueuedTrack] = None
+        self._loop = asyncio.get_running_loop()
+        self._advancing: Optional[asyncio.Task] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.now_playing is not None or bool(self.queue) or self._is_advancing
+
+    @property
+    def _is_advancing(self) -> bool:
+        return self._advancing is not None and not self._advancing.done()
+
+    def enqueue(self, track: ResolvedTrack, requested_by: str = None) -> QueuedTrack:
+        item = QueuedTrack(track, requested_by, self._loop.create_future())
+        self.queue.append(item)
+        if self.now_playing is None and not self._is_advancing:
+            self._advance()
+        return item
+
+    def skip(self) -> bool:
+        if not self.voice_client.is_playing():
+            return False
+        # Stopping fires the `after` callback, which starts the next track
+        self.voice_client.stop()
+        return True
+
+    def stop(self) -> None:
+        while self.queue:
+            self._finish(self.queue.popleft(), None)
+        if self.voice_client.is_playing():
+            self.voice_client.stop()
+
+    def _advance(self) -> None:
+        self._advancing = asyncio.create_task(self._play_next())
+
+    async def _play_next(self):
+        while self.queue:
+            item = self.queue.popleft()
+            try:
+                source = await self.source_factory(item.track)
+                self.now_playing = item
+                self.voice_client.play(source, after=lambda error, ended=item: self._loop.call_soon_threadsafe(
+                    self._track_ended, ended, error))
+                logger.info(f"Now playing {item.track.title} in guild {self.guild_id}")
+                return
+            except Exception as e:
+                logger.error(f"Failed to play {item.track.title}: {e}")
+                self.now_playing = None
+                self._finish(item, e)
+
+    def _track_ended(self, item: QueuedTrack, error: Optional[Exception]) -> None:
+        if error:
+            logger.error(f"Playback error in guild {self.guild_id}: {error}")
+        self.now_playing = None
+        self._finish(item, error)
+        self._advance()
+
+    @staticmethod
+    def _finish(item: QueuedTrack, error: Optional[Exception]) -> None:
+        if not item.finished.done():
+            item.finished.set_result(error)
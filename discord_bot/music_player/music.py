@@ -1,30 +1,48 @@
 import asyncio
 import random
 from logging import getLogger
+from typing import Optional
 
 import discord
-import yt_dlp
+
+from discord_bot.models.propaganda_config import AudioCacheConfig
+from discord_bot.music_player.audio_cache import AudioCache
+from discord_bot.music_player.extraction import get_extraction_service
+from discord_bot.music_player.guild_player import GuildPlayer, QueuedTrack, probe_source
+from discord_bot.music_player.track_cache import ResolvedTrack, TrackCache
+from discord_bot.music_player.voice_pool import VoiceConnectionPool
 
 logger = getLogger(__name__)
 
 
 class MusicPlayer:
 
-    def __init__(self):
-        self.voice_clients = {}
+    def __init__(self, voice_idle_timeout: float = 300, audio_cache_config: AudioCacheConfig = None):
+        self.voice_pool = VoiceConnectionPool(voice_idle_timeout)
+        self.players: dict[int, GuildPlayer] = {}
         self.playlist = []
+        self.extraction_service = get_extraction_service()
+        self.track_cache = TrackCache(self.extraction_service)
+        self.audio_cache = AudioCache(audio_cache_config or AudioCacheConfig())
 
     def add_to_playlist(self, url):
         self.playlist.append(url)
 
+    def get_player(self, guild_id: int) -> Optional[GuildPlayer]:
+        return self.players.get(guild_id)
+
     async def join_and_play(self,
                             interaction: discord.Interaction = None,
                             url: str = None,
-                            force_voice_channel: bool = False):
-        if not force_voice_channel and interaction and (not interaction.user or not interaction.user.voice):
-            if interaction:
-                await interaction.followup.send(
-                    "You must be in a voice channel to use this command!")
+                            voice_channel: discord.VoiceChannel = None):
+        """Queue `url` on the guild's player, in the user's voice channel or `voice_channel`.
+
+        Slash commands get a reply as soon as the track is queued. Without an interaction
+        (scheduler, alerts) this waits until the track has finished playing.
+        """
+        if interaction and (not interaction.user or not interaction.user.voice):
+            await interaction.followup.send(
+                "You must be in a voice channel to use this command!")
             return
 
         # Check if ffmpeg is installed
@@ -35,89 +53,93 @@ class MusicPlayer:
                     "Error: ffmpeg is not installed. Please contact the bot administrator.")
             logger.warning("ffmpeg is not installed. Please contact the bot administrator.")
 
-        try:
-            # Determine the guild ID based on whether an interaction is provided
-            guild_id = interaction.guild.id if interaction else list(self.voice_clients.keys())[
-                0] if self.voice_clients else None
-            if guild_id is None:
-                if interaction:
-                    await interaction.followup.send("Bot is not connected to any voice channel.")
-                return
-
-            # Get or create a voice client
-            voice_client = self.voice_clients.get(guild_id)
-            if not voice_client:
-                if interaction:
-                    channel = interaction.user.voice.channel
-                else:
-                    # Attempt to get a channel from the first guild in the client list.  This is a fallback and may fail.
-                    channel = list(self.voice_clients.values())[0].channel
-                voice_client = await channel.connect()
-                self.voice_clients[guild_id] = voice_client
-
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                if url is None and self.playlist:
-                    # Play random song from playlist
-                    url = random.choice(self.playlist)
-
-                if url:
-                    try:
-                        # Extract video info
-                        info = ydl.extract_info(url, download=False)
-                        if 'entries' in info:
-                            # Handle playlist URL - get all valid entries first
-                            valid_entries = [entry for entry in info['entries'] if entry is not None]
-                            if not valid_entries:
-                                raise Exception("No valid videos found in playlist")
-                            # Select random video from valid entries
-                            video = random.choice(valid_entries)
-                            url = f"https://www.youtube.com/watch?v={video['id']}"
-                            # Get specific video info
-                            info = ydl.extract_info(url, download=False, force_generic_extractor=False)
-
-                        # Get audio stream URL
-                        audio_url = info['url']
-
-                        # Create audio source and play with delay
-                        await asyncio.sleep(1)  # Wait before playing
-                        source = await discord.FFmpegOpusAudio.from_probe(
-                            audio_url,
-                            before_options="-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5")
-                        voice_client.play(source)
-
-                        # Send confirmation message if interaction is available
-                        if interaction:
-                            await interaction.followup.send(
-                                f"🎵 Now playing: {info.get('title', 'Unknown')}")
-
-                        # Wait until song finishes
-                        while voice_client.is_playing():
-                            await asyncio.sleep(1)
-
-                    except Exception as e:
-                        if interaction:
-                            await interaction.followup.send(
-                                f"Error playing song: {str(e)}")
-                else:
-                    if interaction:
-                        await interaction.followup.send(
-                            "No URL provided and playlist is empty!")
-
-                # Disconnect after playing if not force_voice_channel
-                if not force_voice_channel:
-                    await voice_client.disconnect()
-                    del self.voice_clients[guild_id]
-
-        except Exception as e:
+        if interaction:
+            voice_channel = interaction.user.voice.channel
+        if voice_channel is None:
+            logger.error("No voice channel to play in")
+            return
+
+        if url is None and self.playlist:
+            # Play random song from playlist
+            url = random.choice(self.playlist)
+
+        if not url:
             if interaction:
-                await interaction.followup.send(f"Error: {str(e)}")
-            if guild_id in self.voice_clients:
-                await self.voice_clients[guild_id].disconnect()
-                del self.voice_clients[guild_id]
+                await interaction.followup.send(
+                    "No URL provided and playlist is empty!")
+            return
+
+        guild_id = voice_channel.guild.id
+        # Connect while the audio stream resolves (a random video for playlist URLs)
+        voice_client, track = await asyncio.gather(self.voice_pool.acquire(voice_channel),
+                                                   self.resolve(url), return_exceptions=True)
+        if isinstance(voice_client, Exception) or isinstance(track, Exception):
+            if not isinstance(voice_client, Exception):
+                self.voice_pool.release(guild_id)
+            error = track if isinstance(track, Exception) else voice_client
+            if interaction:
+                await interaction.followup.send(
+                    f"Error playing song: {str(error)}")
+            logger.error(f"Error preparing playback: {error}")
+            return
+
+        player = self._player_for(guild_id, voice_client)
+        starts_now = not player.is_active
+        item = self._enqueue(player, track, interaction.user.display_name if interaction else None)
+
+        # Send confirmation message if interaction is available
+        if interaction:
+            if starts_now:
+                await interaction.followup.send(f"🎵 Now playing: {track.title}")
+            else:
+                await interaction.followup.send(f"🎶 Queued #{len(player.queue)}: {track.title}")
+            return
+
+        if error := await item.finished:
+            logger.error(f"Error playing {track.title}: {error}")
+
+    async def resolve(self, url: str) -> ResolvedTrack:
+        """Resolve `url` (a random video for playlists), from the on-disk audio cache when possible."""
+        return self.audio_cache.cached_track(url) or await self.track_cache.resolve(url)
+
+    async def warm_up(self, voice_channel: discord.VoiceChannel) -> None:
+        """Connect to `voice_channel` ahead of time; the pool keeps the connection until it idles out."""
+        await self.voice_pool.acquire(voice_channel)
+        self.voice_pool.release(voice_channel.guild.id)
+
+    async def play(self, voice_channel: discord.VoiceChannel, track: ResolvedTrack) -> Optional[Exception]:
+        """Queue an already resolved track in `voice_channel` and wait until it has finished playing."""
+        voice_client = await self.voice_pool.acquire(voice_channel)
+        item = self._enqueue(self._player_for(voice_channel.guild.id, voice_client), track, None)
+        return await item.finished
+
+    def _player_for(self, guild_id: int, voice_client: discord.VoiceClient) -> GuildPlayer:
+        player = self.players.get(guild_id)
+        if player is None:
+            player = GuildPlayer(guild_id, voice_client, self._create_source)
+            self.players[guild_id] = player
+        player.voice_client = voice_client
+        return player
+
+    def _enqueue(self, player: GuildPlayer, track: ResolvedTrack, requested_by: Optional[str]) -> QueuedTrack:
+        item = player.enqueue(track, requested_by=requested_by)
+        # The voice lease is held until this track is done, then the pool's idle timer takes over
+        item.finished.add_done_callback(lambda _: self.voice_pool.release(player.guild_id))
+        return item
+
+    async def _create_source(self, track: ResolvedTrack) -> discord.AudioSource:
+        self.audio_cache.record_play(track)
+        if path := self.audio_cache.path_for(track.video_id):
+            # Cached clips are already Ogg/Opus, so ffmpeg only has to remux them
+            return discord.FFmpegOpusAudio(str(path), codec='copy')
+        return await probe_source(track)
+
+    def skip(self, guild_id: int) -> bool:
+        player = self.players.get(guild_id)
+        return player.skip() if player else False
+
+    async def leave(self, guild_id: int) -> bool:
+        """Stop playback, drop the queue and disconnect from the guild's voice channel."""
+        if player := self.players.pop(guild_id, None):
+            player.stop()
+        return await self.voice_pool.disconnect(guild_id)
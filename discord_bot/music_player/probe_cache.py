@@ -0,0 +1,53 @@
+from functools import cache
+from logging import getLogger
+from typing import Optional
+
+import discord
+from cachetools import LRUCache
+
+from discord_bot.music_player.track_cache import ResolvedTrack
+
+logger = getLogger(__name__)
+
+PROBE_CACHE_SIZE = 1024
+
+
+class ProbeCache:
+    """Remembers the codec and bitrate ffprobe reported for each video, so later plays of the same
+    video start ffmpeg directly instead of probing the remote stream first.
+    """
+
+    def __init__(self, maxsize: int = PROBE_CACHE_SIZE):
+        self._probes: LRUCache[str, tuple[Optional[str], Optional[int]]] = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    async def create_source(self, track: ResolvedTrack, before_options: str = None) -> discord.FFmpegOpusAudio:
+        probe = self._probes.get(track.video_id) if track.video_id else None
+        hit = probe is not None
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+            probe = await discord.FFmpegOpusAudio.probe(track.stream_url)
+            if track.video_id and probe[0] is not None:
+                self._probes[track.video_id] = probe
+
+        codec, bitrate = probe
+        logger.info(f"Probe cache {'hit' if hit else 'miss'} for {track.title} ({codec}, {bitrate}kbps), "
+                    f"hit ratio {self.hit_ratio:.0%}")
+        # An Opus stream is passed through as-is, anything else is encoded to Opus at the probed bitrate
+        return discord.FFmpegOpusAudio(track.stream_url, codec=codec, bitrate=bitrate, before_options=before_options)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._probes), "hits": self.hits, "misses": self.misses, "hit_ratio": self.hit_ratio}
+
+
+@cache
+def get_probe_cache() -> ProbeCache:
+    return ProbeCache()
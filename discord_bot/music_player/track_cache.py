@@ -0,0 +1,116 @@
+import random
+from asyncio import Task, create_task
+from dataclasses import dataclass
+from logging import getLogger
+from time import monotonic, time
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from cachetools import TLRUCache, TTLCache
+
+from discord_bot.music_player.extraction import ExtractionService
+
+logger = getLogger(__name__)
+
+PLAYLIST_TTL = 24 * 3600
+PLAYLIST_REFRESH_AFTER = 3600
+DEFAULT_STREAM_TTL = 3600
+STREAM_EXPIRY_MARGIN = 300
+
+
+@dataclass
+class ResolvedTrack:
+    url: str
+    video_id: Optional[str]
+    title: str
+    stream_url: str
+    expires_at: float
+
+
+class TrackCache:
+    """Two-tier cache: flat playlist listings (long TTL, refreshed in the background) and
+    resolved audio stream URLs (kept until shortly before their signed URL expires).
+
+    A random track for the next play of each playlist is resolved ahead of time.
+    """
+
+    def __init__(self, extraction_service: ExtractionService):
+        self._extraction_service = extraction_service
+        self._playlists: TTLCache[str, tuple[float, list[dict]]] = TTLCache(maxsize=32, ttl=PLAYLIST_TTL)
+        self._streams: TLRUCache[str, ResolvedTrack] = TLRUCache(
+            maxsize=256, ttu=lambda _, track, __: track.expires_at, timer=time)
+        self._prefetched: dict[str, ResolvedTrack] = {}
+        self._background: set[Task] = set()
+
+    async def resolve(self, url: str) -> ResolvedTrack:
+        """Resolve a video URL, or a random video when `url` is a playlist."""
+        if track := self._streams.get(url):
+            return track
+
+        if url in self._playlists:
+            return await self._random_track(url, self._playlist_entries(url))
+
+        info = await self._extraction_service.extract(url)
+        if 'entries' in info:
+            entries = self._store_playlist(url, info)
+            return await self._random_track(url, entries)
+        return self._store_track(url, info)
+
+    def _playlist_entries(self, url: str) -> list[dict]:
+        fetched_at, entries = self._playlists[url]
+        if monotonic() - fetched_at > PLAYLIST_REFRESH_AFTER:
+            self._in_background(self._refresh_playlist(url))
+        return entries
+
+    def _store_playlist(self, url: str, info: dict) -> list[dict]:
+        entries = [entry for entry in info['entries'] if entry is not None]
+        if not entries:
+            raise Exception("No valid videos found in playlist")
+        self._playlists[url] = (monotonic(), entries)
+        return entries
+
+    async def _refresh_playlist(self, url: str):
+        self._playlists[url] = (monotonic(), self._playlists[url][1])
+        try:
+            self._store_playlist(url, await self._extraction_service.extract(url))
+            logger.info(f"Refreshed cached playlist {url}")
+        except Exception as e:
+            logger.warning(f"Failed to refresh playlist {url}: {e}")
+
+    async def _random_track(self, playlist_url: str, entries: list[dict]) -> ResolvedTrack:
+        track = self._prefetched.pop(playlist_url, None)
+        if track is None or track.expires_at <= time():
+            track = await self._resolve_video(random.choice(entries))
+        self._in_background(self._prefetch(playlist_url, entries))
+        return track
+
+    async def _prefetch(self, playlist_url: str, entries: list[dict]):
+        try:
+            self._prefetched[playlist_url] = await self._resolve_video(random.choice(entries))
+        except Exception as e:
+            logger.warning(f"Failed to prefetch next track for {playlist_url}: {e}")
+
+    async def _resolve_video(self, entry: dict) -> ResolvedTrack:
+        url = f"https://www.youtube.com/watch?v={entry['id']}"
+        if track := self._streams.get(url):
+            return track
+        return self._store_track(url, await self._extraction_service.extract(url, flat=False))
+
+    def _store_track(self, url: str, info: dict) -> ResolvedTrack:
+        track = ResolvedTrack(url=url, video_id=info.get('id'), title=info.get('title', 'Unknown'),
+                              stream_url=info['url'], expires_at=_stream_expiry(info['url']))
+        self._streams[url] = track
+        return track
+
+    def _in_background(self, coroutine) -> None:
+        task = create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+def _stream_expiry(stream_url: str) -> float:
+    """Signed stream URLs carry their expiry as a unix timestamp in the `expire` query parameter."""
+    expire = parse_qs(urlparse(stream_url).query).get('expire', [None])[0]
+    if expire and expire.isdigit():
+        return int(expire) - STREAM_EXPIRY_MARGIN
+    return time() + DEFAULT_STREAM_TTL
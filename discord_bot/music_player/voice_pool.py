@@ -0,0 +1,78 @@
+import asyncio
+from logging import getLogger
+
+import discord
+
+logger = getLogger(__name__)
+
+
+class VoiceConnectionPool:
+    """Owns one voice connection per guild and hands out leases on it.
+
+    A connection is reused while it is warm and only disconnected once it has had no
+    leases for `idle_timeout` seconds.
+    """
+
+    def __init__(self, idle_timeout: float):
+        self.idle_timeout = idle_timeout
+        self._connections: dict[int, discord.VoiceClient] = {}
+        self._leases: dict[int, int] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._idle_timers: dict[int, asyncio.TimerHandle] = {}
+
+    async def acquire(self, channel: discord.VoiceChannel) -> discord.VoiceClient:
+        guild_id = channel.guild.id
+        async with self._locks.setdefault(guild_id, asyncio.Lock()):
+            self._cancel_idle_timer(guild_id)
+            self._leases[guild_id] = self._leases.get(guild_id, 0) + 1
+            try:
+                return await self._connect(channel)
+            except BaseException:
+                # Cancellation too, e.g. a caller's timeout firing mid-handshake, or the guild never goes idle
+                self.release(guild_id)
+                raise
+
+    def release(self, guild_id: int) -> None:
+        self._leases[guild_id] = max(0, self._leases.get(guild_id, 0) - 1)
+        if self._leases[guild_id] == 0 and guild_id in self._connections:
+            loop = asyncio.get_running_loop()
+            self._idle_timers[guild_id] = loop.call_later(
+                self.idle_timeout, lambda: asyncio.create_task(self._disconnect_if_idle(guild_id)))
+
+    async def disconnect(self, guild_id: int) -> bool:
+        self._cancel_idle_timer(guild_id)
+        voice_client = self._connections.pop(guild_id, None)
+        if voice_client is None:
+            return False
+        await voice_client.disconnect()
+        logger.info(f"Disconnected from voice in guild {guild_id}")
+        return True
+
+    async def _connect(self, channel: discord.VoiceChannel) -> discord.VoiceClient:
+        guild_id = channel.guild.id
+        # discord.py keeps a client whose connect() was cancelled registered on the guild and refuses any new
+        # connection there, so a client the pool does not know about is reused or torn down as well
+        voice_client = self._connections.get(guild_id) or channel.guild.voice_client
+        if voice_client and voice_client.is_connected():
+            self._connections[guild_id] = voice_client
+            if voice_client.channel.id != channel.id:
+                await voice_client.move_to(channel)
+            return voice_client
+
+        if voice_client:
+            self._connections.pop(guild_id, None)
+            await voice_client.disconnect(force=True)
+        # connect() only returns once the voice handshake has completed, so no settling delay is needed
+        voice_client = await channel.connect(reconnect=True)
+        self._connections[guild_id] = voice_client
+        logger.info(f"Connected to voice channel {channel.name}")
+        return voice_client
+
+    async def _disconnect_if_idle(self, guild_id: int):
+        self._idle_timers.pop(guild_id, None)
+        if self._leases.get(guild_id, 0) == 0:
+            await self.disconnect(guild_id)
+
+    def _cancel_idle_timer(self, guild_id: int) -> None:
+        if timer := self._idle_timers.pop(guild_id, None):
+            timer.cancel()
@@ -0,0 +1,77 @@
+import asyncio
+from dataclasses import dataclass, field
+from logging import getLogger
+from time import monotonic
+from typing import Any, Awaitable, Callable, Optional
+
+logger = getLogger(__name__)
+
+
+class StageSkipped(Exception):
+    pass
+
+
+@dataclass
+class Stage:
+    name: str
+    # Called with the results of `depends_on`, in order
+    func: Callable[..., Awaitable[Any]]
+    depends_on: tuple[str, ...] = ()
+    timeout: Optional[float] = None
+
+
+@dataclass
+class PipelineResult:
+    results: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+
+    def failed(self) -> dict[str, BaseException]:
+        """Stages that failed or timed out themselves, without the ones skipped because of them."""
+        return {name: error for name, error in self.errors.items() if not isinstance(error, StageSkipped)}
+
+
+class Pipeline:
+    """Runs async stages as a small dependency graph.
+
+    Every stage starts as soon as its dependencies finish, so independent stages overlap. Each stage has
+    its own timeout, and a failure only skips the stages that depend on it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._stages: dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable[..., Awaitable[Any]], depends_on: tuple[str, ...] = (),
+            timeout: Optional[float] = None) -> None:
+        missing = [dependency for dependency in depends_on if dependency not in self._stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages {missing}")
+        self._stages[name] = Stage(name, func, depends_on, timeout)
+
+    async def run(self) -> PipelineResult:
+        result = PipelineResult()
+        tasks: dict[str, asyncio.Task] = {}
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.create_task(self._run_stage(stage, tasks, result))
+        await asyncio.gather(*tasks.values())
+        return result
+
+    async def _run_stage(self, stage: Stage, tasks: dict[str, asyncio.Task], result: PipelineResult):
+        await asyncio.gather(*(tasks[dependency] for dependency in stage.depends_on))
+        failed_dependencies = [dependency for dependency in stage.depends_on if dependency in result.errors]
+        if failed_dependencies:
+            result.errors[stage.name] = StageSkipped(f"{', '.join(failed_dependencies)} failed")
+            logger.warning(f"{self.name}: skipped {stage.name} because {', '.join(failed_dependencies)} failed")
+            return
+
+        started_at = monotonic()
+        try:
+            arguments = [result.results[dependency] for dependency in stage.depends_on]
+            result.results[stage.name] = await asyncio.wait_for(stage.func(*arguments), stage.timeout)
+            logger.info(f"{self.name}: {stage.name} finished in {monotonic() - started_at:.1f}s")
+        except asyncio.TimeoutError:
+            result.errors[stage.name] = TimeoutError(f"{stage.name} timed out after {stage.timeout}s")
+            logger.error(f"{self.name}: {stage.name} timed out after {stage.timeout}s")
+        except Exception as e:
+            result.errors[stage.name] = e
+            logger.error(f"{self.name}: {stage.name} failed: {e}", exc_info=True)
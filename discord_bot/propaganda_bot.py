@@ -19,7 +19,20 @@ class PropagandaBot(commands.Bot):
         intents.voice_states = True
 
         from discord_bot.music_player.music import MusicPlayer
-        self.music_player = MusicPlayer()
+        self.music_player = MusicPlayer(voice_idle_timeout=bot_config.voice_idle_timeout,
+                                        audio_cache_config=bot_config.audio_cache)
+
+        from discord_bot.content_generation.poster_reservoir import PosterReservoir
+        self.poster_reservoir = PosterReservoir(bot_config.poster_reservoir)
+
+        from discord_bot.content_generation.generation_queue import GenerationQueue
+        self.generation_queue = GenerationQueue(bot_config.generation_queue)
+
+        from discord_bot.content_generation.poster_archive import PosterArchive
+        self.poster_archive = PosterArchive(bot_config.poster_archive)
+
+        from discord_bot.models.guild_config import GuildConfigStore
+        self.guild_configs = GuildConfigStore(bot_config.guild_config_database, bot_config.propaganda_scheduler)
 
         super().__init__(*args, command_prefix="/", intents=intents, **kwargs)
 
@@ -37,12 +50,35 @@ class PropagandaBot(commands.Bot):
         logger.info(
             f"{len(synced_commands)} Commands synced with Discord {synced_commands=}"
         )
+        # Download the alert clips ahead of the first alert, without holding up login
+        from steam_monitor.game_rules import GameRuleRegistry
+        alert_urls = GameRuleRegistry.from_config(self.propaganda_config).video_urls()
+        self.audio_cache_warm_up = self.loop.create_task(self.music_player.audio_cache.warm_up(
+            [*alert_urls, *self.propaganda_config.audio_cache.warm_urls]))
 
     async def on_ready(self):
         logger.info(f'Logged in as {self.user.name} (ID: {self.user.id})')
         logger.info('------')
-        # Set up the scheduled task for daily poster generation
-        setup_scheduler(self, self.tokens_config.wavespeed_tokens)
+        await self.guild_configs.seed_from_global(self)
+        # Set up the scheduled tasks for daily poster generation, one per configured guild
+        await setup_scheduler(self, self.tokens_config.wavespeed_tokens)
+        self.poster_reservoir.start(self, self.tokens_config.wavespeed_tokens)
+        # on_ready fires again on every reconnect, so the monitor is only started the first time
+        from steam_monitor.steam_monitor import get_steam_monitor
+        steam_monitor = get_steam_monitor(self)
+        if not steam_monitor.is_monitoring:
+            await steam_monitor.start()
+
+    async def close(self):
+        # Stop Steam monitoring first, so the latest presence history is saved before the loop goes away
+        from steam_monitor.steam_monitor import get_steam_monitor
+        steam_monitor = get_steam_monitor(self)
+        if steam_monitor.is_monitoring:
+            try:
+                await steam_monitor.stop()
+            except Exception as e:
+                logger.error(f"Failed to stop Steam monitoring: {e}")
+        await super().close()
 
     async def on_error(self, event, *args, **kwargs):
         logger.error(f'Error in event {event}', exc_info=True)
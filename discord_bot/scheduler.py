@@ -1,114 +1,88 @@
-import asyncio
 import logging
 from datetime import datetime
 
 import pytz
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
 
-from discord_bot.content_generation.generate_poster import generate_propaganda_poster
-from discord_bot.models.scheduler_state import get_scheduler_state
+from discord_bot.content_generation.generate_poster import (generate_propaganda_poster, generate_poster_variants,
+                                                            get_output_channels)
+from discord_bot.pipeline import Pipeline
+from discord_bot.scheduler_service import DailyJob, get_scheduler_service
 
 logger = logging.getLogger(__name__)
 
-
-def setup_scheduler(bot, api_tokens: list[str]):
-    current_scheduler_state = get_scheduler_state()
-
-    # Shutdown existing scheduler if it exists
-    try:
-        if current_scheduler_state.current_scheduler:
-            current_scheduler_state.current_scheduler.shutdown(wait=False)
-    except Exception as e:
-        logger.error(f"Error shutting down existing scheduler: {e}")
-
-    scheduler = AsyncIOScheduler()
-    current_scheduler_state.current_scheduler = scheduler
-
-    # Get the configured time and timezone from the bot's propaganda_config
-    hour = bot.propaganda_config.propaganda_scheduler.time.hour
-    minute = bot.propaganda_config.propaganda_scheduler.time.minute
-    timezone = pytz.timezone(bot.propaganda_config.propaganda_scheduler.timezone)
-
-    # Check if we missed today's run within last 5 minutes
-    now = datetime.now(timezone)
-    scheduled_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-    time_diff = now - scheduled_time
-
-    if 0 <= time_diff.total_seconds() <= 300:  # Within 5 minutes after scheduled time
-        logger.info("Missed recent schedule - running now")
-        asyncio.create_task(generate_daily_content(bot, api_tokens))
-
-    # Schedule the daily content generation task
-    scheduler.configure(timezone=timezone)  # Set scheduler default timezone
-    scheduler.add_job(
-        generate_daily_content,
-        CronTrigger(hour=hour, minute=minute, timezone=timezone),
-        args=[bot, api_tokens],
-        id='daily_content',
-        replace_existing=True,
-        misfire_grace_time=600,  # Allow 10 minutes grace period
-        coalesce=True,  # Only run once even if multiple executions are missed
-        max_instances=1  # Ensure only one instance runs at a time
-    )
-
-    # Start the scheduler
-    scheduler.start()
-    logger.info(f"Scheduled daily propaganda poster generation for {hour:02d}:{minute:02d} {timezone}")
-
-
-async def generate_daily_content(bot, api_tokens: list[str]):
-    current_time = datetime.now(pytz.timezone(bot.propaganda_config.propaganda_scheduler.timezone))
+DAILY_CONTENT_JOB_ID = "daily_content"
+
+
+async def setup_scheduler(bot, api_tokens: list[str]):
+    """Apply every guild's daily schedule to the long-lived scheduler, one job per guild with a poster channel.
+
+    Safe to call on every `on_ready` and after every config change: unchanged schedules are left alone,
+    a changed time or timezone is rescheduled in place and guilds without a poster channel lose their job.
+    A run missed while the bot was down is made up once, based on the run ledger.
+    """
+    service = get_scheduler_service(bot.propaganda_config.scheduler_database)
+    # The single job from before schedules were per guild belongs to the guild of the global poster channel
+    if legacy_channel := bot.get_channel(bot.propaganda_config.propaganda_scheduler.poster_output_channel_id):
+        await service.rename(DAILY_CONTENT_JOB_ID, f"{DAILY_CONTENT_JOB_ID}:{legacy_channel.guild.id}")
+    jobs = [DailyJob(f"{DAILY_CONTENT_JOB_ID}:{guild_config.guild_id}", generate_daily_content,
+                     guild_config.time.hour, guild_config.time.minute, guild_config.timezone,
+                     args=(bot, api_tokens, guild_config.guild_id), catch_up_window=guild_config.catch_up_window,
+                     run_timeout=bot.propaganda_config.daily_stage_timeouts.total())
+            for guild_config in bot.guild_configs.all() if guild_config.poster_output_channel_id]
+    await service.sync(DAILY_CONTENT_JOB_ID, jobs)
+    service.ensure_started()
+
+
+async def generate_daily_content(bot, api_tokens: list[str], guild_id: int = None):
+    """Run a guild's daily poster and speech as independent stages.
+
+    Connecting to voice and resolving the speech overlap with poster generation, the speech starts as soon
+    as both are ready, and a failed or slow poster no longer holds up or skips the music.
+    """
+    scheduler_config = bot.guild_configs.get(guild_id) if guild_id else bot.propaganda_config.propaganda_scheduler
+    timeouts = bot.propaganda_config.daily_stage_timeouts
+    current_time = datetime.now(pytz.timezone(scheduler_config.timezone))
     logger.info(f"Scheduler triggered at {current_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
     logger.info("Generating daily propaganda poster and playing music")
 
-    channel_id = bot.propaganda_config.propaganda_scheduler.poster_output_channel_id
-    if not channel_id:
+    pipeline = Pipeline(f"Daily content for guild {guild_id}" if guild_id else "Daily content")
+    channels = get_output_channels(bot, scheduler_config)
+    if channels:
+        pipeline.add("poster", lambda: post_daily_poster(bot, api_tokens, channels), timeout=timeouts.poster)
+    else:
         logger.warning("No channel configured for daily propaganda poster")
-        return
-
-    channel = bot.get_channel(channel_id)
-    if not channel:
-        logger.error(f"Could not find channel with ID {channel_id}")
-        return
-
-    try:
-        # Generate and post the propaganda poster
-        await generate_propaganda_poster(bot, api_tokens, channel)
-        logger.info(f"Successfully posted daily propaganda poster to #{channel.name}")
-
-        # Join and play a random propaganda speech
-        voice_channel_id = bot.propaganda_config.propaganda_scheduler.voice_channel_id
-        playlist_url = bot.propaganda_config.propaganda_scheduler.youtube_playlist_url
-        await play_random_propaganda_speech(bot, voice_channel_id, playlist_url)
-
-    except Exception as e:
-        error_msg = f"Error in daily content generation: {e}"
-        logger.error(error_msg, exc_info=True)
-        await channel.send(f"⚠️ {error_msg}")
-
 
-async def play_random_propaganda_speech(bot, voice_channel_id, playlist_url):
-    voice_channel = bot.get_channel(voice_channel_id)
+    voice_channel = bot.get_channel(scheduler_config.voice_channel_id)
+    playlist_url = scheduler_config.youtube_playlist_url
     if voice_channel and playlist_url:
-        try:
-            # Connect to voice channel and wait for it to be ready
-            voice_client = await voice_channel.connect()
-            await asyncio.sleep(2)  # Wait for voice client to stabilize
-            bot.music_player.voice_clients[voice_channel.guild.id] = voice_client
-
-            # Play random song from playlist
-            await bot.music_player.join_and_play(None, playlist_url, force_voice_channel=True)
-            logger.info(f"Successfully started playing music in voice channel {voice_channel.name}")
-
-            # Disconnect after playing
-            if voice_channel.guild.id in bot.music_player.voice_clients:
-                await bot.music_player.voice_clients[voice_channel.guild.id].disconnect()
-                del bot.music_player.voice_clients[voice_channel.guild.id]
-        except Exception as e:
-            logger.error(f"Error playing music: {e}")
+        music_player = bot.music_player
+        pipeline.add("voice", lambda: music_player.warm_up(voice_channel), timeout=timeouts.voice)
+        pipeline.add("track", lambda: music_player.resolve(playlist_url), timeout=timeouts.track)
+        pipeline.add("speech", lambda _, track: play_propaganda_speech(bot, voice_channel, track),
+                     depends_on=("voice", "track"), timeout=timeouts.speech)
     else:
         if not voice_channel:
-            logger.error(f"Could not find voice channel with ID {voice_channel_id}")
+            logger.error(f"Could not find voice channel with ID {scheduler_config.voice_channel_id}")
         if not playlist_url:
             logger.error("No playlist URL configured")
+
+    failed = (await pipeline.run()).failed()
+    if failed and channels:
+        error_msg = "Error in daily content generation: " + "; ".join(
+            f"{stage}: {error}" for stage, error in failed.items())
+        await channels[0].send(f"⚠️ {error_msg}")
+
+
+async def post_daily_poster(bot, api_tokens: list[str], channels: list):
+    # Generate and post the propaganda poster
+    if bot.propaganda_config.poster_variants > 1:
+        await generate_poster_variants(bot, api_tokens, channels)
+    else:
+        await generate_propaganda_poster(bot, api_tokens, channels)
+    logger.info(f"Successfully posted daily propaganda poster to {len(channels)} channels")
+
+
+async def play_propaganda_speech(bot, voice_channel, track):
+    if error := await bot.music_player.play(voice_channel, track):
+        raise error
+    logger.info(f"Finished playing music in voice channel {voice_channel.name}")
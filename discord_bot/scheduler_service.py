@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import cache
+from typing import Any, Callable, Iterable, Optional
+
+import pytz
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from discord_bot.scheduler_store import SchedulerStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DailyJob:
+    job_id: str
+    func: Callable
+    hour: int
+    minute: int
+    timezone: str
+    args: tuple[Any, ...] = field(default=(), compare=False)
+    # How late a run missed while the bot was down may still be made up at startup
+    catch_up_window: int = field(default=3 * 3600, compare=False)
+    # Longest a run can take; a run still marked running after that was abandoned by a crash and is made up
+    run_timeout: float = field(default=3 * 3600, compare=False)
+
+    def trigger(self) -> CronTrigger:
+        return CronTrigger(hour=self.hour, minute=self.minute, timezone=pytz.timezone(self.timezone))
+
+    def previous_fire_time(self, now: datetime) -> Optional[datetime]:
+        """The latest scheduled instant at or before `now`, which a daily trigger has within one day."""
+        fire_time = self.trigger().get_next_fire_time(None, now - timedelta(days=1))
+        return fire_time if fire_time and fire_time <= now else None
+
+
+class SchedulerService:
+    """One long-lived APScheduler instance for the whole process.
+
+    Jobs are applied as diffs against what is already scheduled: new jobs are added, changed times are
+    rescheduled in place and jobs that disappear from a group are removed, so applying the same
+    configuration again (for example on every gateway reconnect) is a no-op.
+
+    Job definitions and a ledger of runs are kept in a SQLite store. Every run first claims its scheduled
+    instant in the ledger, so a completed run is never repeated, and a run that was missed, failed or cut
+    short while the bot was down is made up once at startup.
+    """
+
+    def __init__(self, store: SchedulerStore):
+        self.scheduler = AsyncIOScheduler()
+        self.store = store
+        self._jobs: dict[str, DailyJob] = {}
+        # Definitions as last persisted, which is what was scheduled while the bot was down; loaded on first use
+        self._persisted_jobs: Optional[dict[str, tuple[int, int, str]]] = None
+        # Changes are applied one at a time, since each one waits for its store write
+        self._lock = asyncio.Lock()
+
+    def ensure_started(self) -> None:
+        if not self.scheduler.running:
+            self.scheduler.start()
+            logger.info("Scheduler started")
+
+    async def apply(self, job: DailyJob) -> bool:
+        """Add or update one job; returns True when the schedule changed."""
+        async with self._lock:
+            return await self._apply(job)
+
+    async def remove(self, job_id: str) -> None:
+        async with self._lock:
+            await self._remove(job_id)
+
+    async def sync(self, group: str, jobs: Iterable[DailyJob]) -> None:
+        """Make the jobs whose ID starts with `group` exactly `jobs`."""
+        jobs = list(jobs)
+        wanted = {job.job_id for job in jobs}
+        async with self._lock:
+            for job_id in [job_id for job_id in self._jobs if job_id.startswith(group) and job_id not in wanted]:
+                await self._remove(job_id)
+            for job in jobs:
+                await self._apply(job)
+
+    async def rename(self, old_id: str, new_id: str) -> None:
+        """Carry a job persisted under an old ID over to `new_id`, so its last run still counts for catch-up.
+
+        Must be called before the job is applied under its new ID.
+        """
+        async with self._lock:
+            persisted_jobs = await self._load()
+            if old_id not in persisted_jobs:
+                return
+            await asyncio.to_thread(self.store.rename_job, old_id, new_id)
+            persisted_jobs.setdefault(new_id, persisted_jobs.pop(old_id))
+            logger.info(f"Carried scheduled job {old_id} over to {new_id}")
+
+    async def _load(self) -> dict[str, tuple[int, int, str]]:
+        # Store access commits to SQLite, so it runs in a worker thread rather than on the event loop
+        if self._persisted_jobs is None:
+            self._persisted_jobs = await asyncio.to_thread(self.store.load_jobs)
+            # Runs still marked running were cut short by the previous process and are owed again
+            if abandoned := await asyncio.to_thread(self.store.abandon_runs):
+                logger.warning(f"{abandoned} scheduled runs were interrupted by a restart")
+        return self._persisted_jobs
+
+    async def _apply(self, job: DailyJob) -> bool:
+        persisted_jobs = await self._load()
+        current = self._jobs.get(job.job_id)
+        self._jobs[job.job_id] = job
+        if current == job:
+            return False
+
+        if current is None:
+            self.scheduler.add_job(
+                self._run,
+                job.trigger(),
+                args=[job.job_id],
+                id=job.job_id,
+                name=job.func.__name__,
+                replace_existing=True,
+                misfire_grace_time=600,  # Allow 10 minutes grace period
+                coalesce=True,  # Only run once even if multiple executions are missed
+                max_instances=1  # Ensure only one instance runs at a time
+            )
+            logger.info(f"Scheduled {job.job_id} for {job.hour:02d}:{job.minute:02d} {job.timezone}")
+            await self._catch_up(job)
+        else:
+            self.scheduler.reschedule_job(job.job_id, trigger=job.trigger())
+            logger.info(f"Rescheduled {job.job_id} to {job.hour:02d}:{job.minute:02d} {job.timezone}")
+        await asyncio.to_thread(self.store.save_job, job.job_id, job.hour, job.minute, job.timezone)
+        persisted_jobs[job.job_id] = (job.hour, job.minute, job.timezone)
+        return True
+
+    async def _remove(self, job_id: str) -> None:
+        persisted_jobs = await self._load()
+        if self._jobs.pop(job_id, None) is not None:
+            self.scheduler.remove_job(job_id)
+            await asyncio.to_thread(self.store.delete_job, job_id)
+            persisted_jobs.pop(job_id, None)
+            logger.info(f"Removed scheduled job {job_id}")
+
+    async def _catch_up(self, job: DailyJob) -> None:
+        persisted = self._persisted_jobs.get(job.job_id)
+        if persisted is None:
+            # A job that has never been scheduled before owes nothing
+            return
+        scheduled = DailyJob(job.job_id, job.func, *persisted)
+        now = datetime.now(pytz.utc)
+        fire_time = scheduled.previous_fire_time(now)
+        if fire_time is None or (now - fire_time).total_seconds() > job.catch_up_window:
+            return
+        if not await asyncio.to_thread(self.store.has_run, job.job_id, fire_time.timestamp(), job.run_timeout):
+            logger.info(f"Run of {job.job_id} scheduled for {fire_time} is owed - running now")
+            asyncio.create_task(self._run(job.job_id, fire_time.timestamp()))
+
+    async def _run(self, job_id: str, scheduled_for: float = None):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        if scheduled_for is None:
+            fire_time = job.previous_fire_time(datetime.now(pytz.utc))
+            if fire_time is None:
+                return
+            scheduled_for = fire_time.timestamp()
+        if not await asyncio.to_thread(self.store.claim_run, job_id, scheduled_for, job.run_timeout):
+            logger.info(f"Run of {job_id} scheduled for {datetime.fromtimestamp(scheduled_for, pytz.utc)} "
+                        f"already happened - skipping")
+            return
+
+        try:
+            await job.func(*job.args)
+        except Exception as e:
+            logger.error(f"Scheduled job {job_id} failed: {e}", exc_info=True)
+            await asyncio.to_thread(self.store.finish_run, job_id, scheduled_for, "failed")
+        else:
+            await asyncio.to_thread(self.store.finish_run, job_id, scheduled_for, "completed")
+
+
+@cache
+def get_scheduler_service(database_path: str) -> SchedulerService:
+    return SchedulerService(SchedulerStore(database_path))
@@ -0,0 +1,117 @@
+import sqlite3
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Optional
+
+logger = getLogger(__name__)
+
+
+class SchedulerStore:
+    """SQLite file holding the scheduled job definitions and a ledger of runs, keyed by job ID and the
+    scheduled instant, so each scheduled run is claimed once even across restarts.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    def save_job(self, job_id: str, hour: int, minute: int, timezone: str) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?) ON CONFLICT (job_id) DO UPDATE SET "
+                "hour = excluded.hour, minute = excluded.minute, timezone = excluded.timezone, "
+                "updated_at = excluded.updated_at",
+                (job_id, hour, minute, timezone, time()))
+
+    def delete_job(self, job_id: str) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def rename_job(self, old_id: str, new_id: str) -> None:
+        """Hand a job definition and its latest run over to a new ID, then delete the old rows.
+
+        Rows that already exist under the new ID are kept.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO jobs SELECT ?, hour, minute, timezone, updated_at FROM jobs WHERE job_id = ?",
+                (new_id, old_id))
+            connection.execute(
+                "INSERT OR IGNORE INTO runs SELECT ?, scheduled_for, started_at, finished_at, status FROM runs "
+                "WHERE job_id = ? ORDER BY scheduled_for DESC LIMIT 1", (new_id, old_id))
+            connection.execute("DELETE FROM runs WHERE job_id = ?", (old_id,))
+            connection.execute("DELETE FROM jobs WHERE job_id = ?", (old_id,))
+
+    def load_jobs(self) -> dict[str, tuple[int, int, str]]:
+        with self._lock:
+            rows = self._connect().execute("SELECT job_id, hour, minute, timezone FROM jobs").fetchall()
+        return {job_id: (hour, minute, timezone) for job_id, hour, minute, timezone in rows}
+
+    def has_run(self, job_id: str, scheduled_for: float, run_timeout: float) -> bool:
+        """Whether the run scheduled at `scheduled_for` completed or is still running.
+
+        Failed and abandoned runs do not count, nor does one still marked running after `run_timeout` seconds,
+        whose process must have died.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT 1 FROM runs WHERE job_id = ? AND scheduled_for = ? AND "
+                "(status = 'completed' OR (status = 'running' AND started_at >= ?))",
+                (job_id, scheduled_for, time() - run_timeout)).fetchone()
+        return row is not None
+
+    def claim_run(self, job_id: str, scheduled_for: float, run_timeout: float) -> bool:
+        """Record that the run scheduled at `scheduled_for` is starting; False if it was already claimed.
+
+        Failed and abandoned runs (see `has_run`) are claimed again.
+        """
+        now = time()
+        with self._lock, self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO runs (job_id, scheduled_for, started_at, status) VALUES (?, ?, ?, 'running')",
+                (job_id, scheduled_for, now))
+            if cursor.rowcount == 0:
+                cursor = connection.execute(
+                    "UPDATE runs SET started_at = ?, finished_at = NULL, status = 'running' "
+                    "WHERE job_id = ? AND scheduled_for = ? AND "
+                    "(status IN ('failed', 'abandoned') OR (status = 'running' AND started_at < ?))",
+                    (now, job_id, scheduled_for, now - run_timeout))
+        return cursor.rowcount == 1
+
+    def abandon_runs(self) -> int:
+        """Mark every run still marked running as abandoned, for use at startup when no run can be in flight."""
+        with self._lock, self._connect() as connection:
+            cursor = connection.execute("UPDATE runs SET status = 'abandoned' WHERE status = 'running'")
+        return cursor.rowcount
+
+    def finish_run(self, job_id: str, scheduled_for: float, status: str) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "UPDATE runs SET finished_at = ?, status = ? WHERE job_id = ? AND scheduled_for = ?",
+                (time(), status, job_id, scheduled_for))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    hour INTEGER NOT NULL,
+                    minute INTEGER NOT NULL,
+                    timezone TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )""")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    job_id TEXT NOT NULL,
+                    scheduled_for REAL NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL,
+                    status TEXT NOT NULL,
+                    PRIMARY KEY (job_id, scheduled_for)
+                )""")
+        return self._connection
@@ -0,0 +1,100 @@
+import asyncio
+from dataclasses import dataclass
+from logging import getLogger
+from time import monotonic, time
+from typing import Literal, Optional
+
+from discord_bot.models.propaganda_config import GameAlertRule
+from steam_monitor.handle_game_alert import handle_game_alert
+
+logger = getLogger(__name__)
+
+
+PresenceKind = Literal["started", "stopped", "switched"]
+AlertAction = Literal["started", "stopped"]
+
+
+@dataclass(frozen=True)
+class PresenceEvent:
+    steam_id: str
+    persona_name: str
+    kind: PresenceKind
+    game_id: Optional[str]
+    previous_game_id: Optional[str]
+    timestamp: float
+
+    def actions(self) -> list[tuple[AlertAction, str]]:
+        """A switch from X to Y alerts as stopping X and starting Y."""
+        actions = []
+        if self.previous_game_id:
+            actions.append(("stopped", self.previous_game_id))
+        if self.game_id:
+            actions.append(("started", self.game_id))
+        return actions
+
+
+class AlertDispatcher:
+    """Consumes presence events from a queue so slow alerts (voice connect, playback) never stall polling.
+
+    Events within `coalesce_window` seconds of each other that hit the same game rule become one alert,
+    and a player who already triggered the same alert in the last `debounce_seconds` is not announced again.
+    """
+
+    def __init__(self, steam_monitor, debounce_seconds: float, coalesce_window: float):
+        self.steam_monitor = steam_monitor
+        self.debounce_seconds = debounce_seconds
+        self.coalesce_window = coalesce_window
+        self.events: asyncio.Queue[PresenceEvent] = asyncio.Queue()
+        self._last_alerted: dict[tuple[str, str, AlertAction], float] = {}
+        self._runner: Optional[asyncio.Task] = None
+
+    def publish(self, kind: PresenceKind, player: dict, previous_game_id: Optional[str]) -> None:
+        self.events.put_nowait(PresenceEvent(steam_id=player['steamid'],
+                                             persona_name=player.get('personaname', player['steamid']),
+                                             kind=kind, game_id=player.get('gameid'),
+                                             previous_game_id=previous_game_id, timestamp=time()))
+
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._runner:
+            self._runner.cancel()
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            for rule, action, players in self._alerts(batch):
+                try:
+                    await handle_game_alert(self.steam_monitor, rule, action, players)
+                except Exception as e:
+                    logger.error(f"Error dispatching {rule.name} alert: {e}")
+
+    async def _next_batch(self) -> list[PresenceEvent]:
+        batch = [await self.events.get()]
+        deadline = monotonic() + self.coalesce_window
+        # Events that queued up while the previous alert was playing are picked up here as well
+        while (remaining := deadline - monotonic()) > 0:
+            try:
+                batch.append(await asyncio.wait_for(self.events.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _alerts(self, batch: list[PresenceEvent]) -> list[tuple[GameAlertRule, AlertAction, list[str]]]:
+        now = monotonic()
+        alerts: dict[tuple[int, AlertAction], tuple[GameAlertRule, AlertAction, dict[str, str]]] = {}
+        for event in batch:
+            for action, game_id in event.actions():
+                rule = self.steam_monitor.game_rules.rule_for(event.steam_id, game_id)
+                if rule is None:
+                    continue
+                debounce_key = (event.steam_id, game_id, action)
+                last_alerted = self._last_alerted.get(debounce_key)
+                if last_alerted is not None and now - last_alerted < self.debounce_seconds:
+                    logger.info(f"Skipping repeated {rule.name} {action} alert for {event.persona_name}")
+                    continue
+                self._last_alerted[debounce_key] = now
+                alerts.setdefault((id(rule), action), (rule, action, {}))[2][event.steam_id] = event.persona_name
+        return [(rule, action, list(players.values())) for rule, action, players in alerts.values()]
@@ -0,0 +1,44 @@
+from logging import getLogger
+from typing import Optional
+
+from discord_bot.models.propaganda_config import GameAlertRule, PropagandaConfig
+
+logger = getLogger(__name__)
+
+CS2_GAME_ID = "730"
+
+
+class GameRuleRegistry:
+    """Indexes the game alert rules by game ID and by (steam ID, game ID) for per-player overrides,
+    so each status update resolves its rule with dictionary lookups.
+    """
+
+    def __init__(self, rules: list[GameAlertRule]):
+        self.rules = rules
+        self._by_game: dict[str, GameAlertRule] = {}
+        self._by_player_game: dict[tuple[str, str], GameAlertRule] = {}
+        for rule in rules:
+            if rule.steam_ids:
+                for steam_id in rule.steam_ids:
+                    self._by_player_game[(str(steam_id), rule.game_id)] = rule
+            else:
+                self._by_game[rule.game_id] = rule
+        self.game_ids = frozenset(rule.game_id for rule in rules)
+
+    @classmethod
+    def from_config(cls, config: PropagandaConfig) -> "GameRuleRegistry":
+        rules = config.steam_monitor.game_rules
+        if not rules:
+            # Without explicit rules, fall back to the original CS2 alert in the default alert channel
+            rules = [GameAlertRule(game_id=CS2_GAME_ID, name="CS2",
+                                   video_url=config.propaganda_scheduler.cs2_alert_video_url)]
+        logger.info(f"Loaded {len(rules)} game alert rules for games {', '.join(sorted({r.game_id for r in rules}))}")
+        return cls(rules)
+
+    def rule_for(self, steam_id: str, game_id: Optional[str]) -> Optional[GameAlertRule]:
+        if game_id is None or game_id not in self.game_ids:
+            return None
+        return self._by_player_game.get((steam_id, game_id)) or self._by_game.get(game_id)
+
+    def video_urls(self) -> list[str]:
+        return [rule.video_url for rule in self.rules if rule.video_url]
@@ -0,0 +1,44 @@
+from logging import getLogger
+
+from discord_bot.models.propaganda_config import GameAlertRule
+
+logger = getLogger(__name__)
+
+
+def format_game_alert(template: str, game: str, player_names: list[str]) -> str:
+    if len(player_names) == 1:
+        return template.format(players=player_names[0], game=game)
+    return f"{template.format(players=f'{len(player_names)} friends', game=game)} ({', '.join(player_names)})"
+
+
+async def handle_game_alert(steam_monitor, rule: GameAlertRule, action: str, player_names: list[str]):
+    """Handle when one or more users start or stop playing a game with an alert rule."""
+    try:
+        propaganda_bot = steam_monitor.propaganda_bot
+        voice_channel_id = (rule.voice_channel_id or steam_monitor.alert_settings().voice_channel_id
+                            or propaganda_bot.propaganda_config.propaganda_scheduler.voice_channel_id)
+        message = rule.started_message if action == "started" else rule.stopped_message
+        video_url = rule.video_url if action == "started" else None
+        if not message and not video_url:
+            return
+
+        if voice_channel := propaganda_bot.get_channel(voice_channel_id):
+            logger.info(
+                f"Sending {rule.name} {action} alert in channel {voice_channel.name} for {', '.join(player_names)}"
+            )
+            if message:
+                # A failed or malformed notice must not keep the clip from playing
+                try:
+                    await voice_channel.send(format_game_alert(message, rule.name, player_names))
+                except Exception as e:
+                    logger.warning(f"Failed to send {rule.name} {action} notice: {e}")
+            if video_url:
+                # The voice connection pool reuses a warm connection and disconnects once idle
+                await propaganda_bot.music_player.join_and_play(
+                    None, video_url, voice_channel=voice_channel)
+        else:
+            logger.warning(
+                f"Could not find voice channel with ID {voice_channel_id}"
+            )
+    except Exception as e:
+        logger.error(f"Error playing {rule.name} alert: {e}")
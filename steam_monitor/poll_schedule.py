@@ -0,0 +1,122 @@
+import heapq
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Optional
+
+import pytz
+
+from discord_bot.models.propaganda_config import SteamMonitorConfig
+
+# GetPlayerSummaries personastate values
+PERSONA_OFFLINE = 0
+PERSONA_AWAY_STATES = {2, 3, 4}  # busy, away, snooze
+
+
+class PollTier(Enum):
+    IN_GAME = "in_game"
+    ONLINE = "online"
+    AWAY = "away"
+    RECENTLY_OFFLINE = "recently_offline"
+    DORMANT = "dormant"
+
+
+class PollSchedule:
+    """Decides when each watched Steam account is next due for a status check.
+
+    Every account gets a polling tier from its last summary: players in a game are checked most often,
+    accounts that have been offline for a long time least often, and the slower tiers are stretched
+    further during the configured quiet hours.
+    """
+
+    def __init__(self, config: SteamMonitorConfig, timezone: Callable[[], str]):
+        self.config = config
+        # Looked up on every check, so a timezone change applies without a restart
+        self.timezone = timezone
+        self._due: list[tuple[float, str]] = []
+        self._due_at: dict[str, float] = {}
+        self._last_active: dict[str, float] = {}
+        self._misses: dict[str, int] = {}
+        self.tiers: dict[str, PollTier] = {}
+
+    def watch(self, steam_ids, now: float) -> None:
+        """Add accounts that are polled on the next cycle, and forget ones that are no longer watched."""
+        steam_ids = {str(steam_id) for steam_id in steam_ids}
+        for steam_id in steam_ids - self._due_at.keys():
+            self._schedule(steam_id, now)
+        for steam_id in self._due_at.keys() - steam_ids:
+            del self._due_at[steam_id]
+            self.tiers.pop(steam_id, None)
+            self._last_active.pop(steam_id, None)
+            self._misses.pop(steam_id, None)
+
+    def pop_due(self, now: float) -> list[str]:
+        due = []
+        while self._due and self._due[0][0] <= now:
+            due_at, steam_id = heapq.heappop(self._due)
+            # Entries superseded by a later reschedule are skipped
+            if self._due_at.get(steam_id) == due_at:
+                del self._due_at[steam_id]
+                due.append(steam_id)
+        return due
+
+    def seconds_until_next(self, now: float) -> Optional[float]:
+        while self._due and self._due_at.get(self._due[0][1]) != self._due[0][0]:
+            heapq.heappop(self._due)
+        return max(0.0, self._due[0][0] - now) if self._due else None
+
+    def update(self, player: dict, now: float) -> PollTier:
+        """Reschedule an account from its latest player summary."""
+        steam_id = player['steamid']
+        self._misses.pop(steam_id, None)
+        tier = self._tier_for(player, now)
+        self.tiers[steam_id] = tier
+        self._schedule(steam_id, now + self._interval(tier, now))
+        return tier
+
+    def retry(self, steam_ids, now: float) -> None:
+        for steam_id in steam_ids:
+            self._schedule(steam_id, now + self.config.retry_interval)
+
+    def mark_missing(self, steam_ids, now: float) -> None:
+        """Accounts missing from a response are retried once (their chunk may have failed), then dropped
+        to the slowest rate since Steam has nothing for them."""
+        for steam_id in steam_ids:
+            self._misses[steam_id] = self._misses.get(steam_id, 0) + 1
+            if self._misses[steam_id] == 1:
+                self._schedule(steam_id, now + self.config.retry_interval)
+            else:
+                self.tiers[steam_id] = PollTier.DORMANT
+                self._schedule(steam_id, now + self._interval(PollTier.DORMANT, now))
+
+    def _tier_for(self, player: dict, now: float) -> PollTier:
+        steam_id = player['steamid']
+        persona_state = player.get('personastate', PERSONA_OFFLINE)
+        if player.get('gameid') or persona_state != PERSONA_OFFLINE:
+            self._last_active[steam_id] = now
+
+        if player.get('gameid'):
+            return PollTier.IN_GAME
+        if persona_state in PERSONA_AWAY_STATES:
+            return PollTier.AWAY
+        if persona_state != PERSONA_OFFLINE:
+            return PollTier.ONLINE
+
+        last_active = max(self._last_active.get(steam_id, 0), player.get('lastlogoff', 0))
+        if now - last_active < self.config.recently_offline_window:
+            return PollTier.RECENTLY_OFFLINE
+        return PollTier.DORMANT
+
+    def _interval(self, tier: PollTier, now: float) -> float:
+        interval = getattr(self.config.poll_intervals, tier.value)
+        if tier is not PollTier.IN_GAME and self._in_quiet_hours(now):
+            interval *= self.config.quiet_hours_multiplier
+        return interval
+
+    def _in_quiet_hours(self, now: float) -> bool:
+        start, end = self.config.quiet_hours_start, self.config.quiet_hours_end
+        hour = datetime.fromtimestamp(now, pytz.timezone(self.timezone())).hour
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def _schedule(self, steam_id: str, due_at: float) -> None:
+        self._due_at[steam_id] = due_at
+        heapq.heappush(self._due, (due_at, steam_id))
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+from array import array
+from base64 import b64decode, b64encode
+from datetime import datetime, timedelta
+from logging import getLogger
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = getLogger(__name__)
+
+NO_GAME = 0
+
+
+class PlayerHistory:
+    """Fixed-size ring buffer of one player's presence transitions, stored in parallel typed arrays
+    (8-byte timestamp, 8-byte game ID, 1-byte persona state per entry).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = array('d', [0.0] * capacity)
+        self.game_ids = array('Q', [NO_GAME] * capacity)
+        self.states = array('b', [0] * capacity)
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp: float, game_id: Optional[str], state: int) -> bool:
+        """Record a transition; returns False when nothing changed since the last entry."""
+        game = int(game_id) if game_id else NO_GAME
+        if self.count and self.game_ids[self._last_index] == game and self.states[self._last_index] == state:
+            return False
+        self.timestamps[self.head] = timestamp
+        self.game_ids[self.head] = game
+        self.states[self.head] = state
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def last(self) -> Optional[tuple[float, Optional[str], int]]:
+        if not self.count:
+            return None
+        index = self._last_index
+        game = self.game_ids[index]
+        return self.timestamps[index], str(game) if game != NO_GAME else None, self.states[index]
+
+    def entries(self) -> Iterator[tuple[float, int, int]]:
+        """Entries oldest first, with game IDs as integers."""
+        start = (self.head - self.count) % self.capacity
+        for offset in range(self.count):
+            index = (start + offset) % self.capacity
+            yield self.timestamps[index], self.game_ids[index], self.states[index]
+
+    def play_intervals(self, game_id: str, since: float, until: float) -> Iterator[tuple[float, float]]:
+        """(start, end) spans spent in `game_id`, clipped to [since, until]."""
+        game = int(game_id)
+        started_at = None
+        for timestamp, entry_game, _ in self.entries():
+            if entry_game == game and started_at is None:
+                started_at = timestamp
+            elif entry_game != game and started_at is not None:
+                if timestamp > since:
+                    yield max(started_at, since), min(timestamp, until)
+                started_at = None
+        if started_at is not None and started_at < until:
+            yield max(started_at, since), until
+
+    def to_dict(self) -> dict:
+        # Stored oldest first so the snapshot does not depend on the ring position
+        entries = list(self.entries())
+        return {
+            "timestamps": b64encode(array('d', (entry[0] for entry in entries)).tobytes()).decode(),
+            "game_ids": b64encode(array('Q', (entry[1] for entry in entries)).tobytes()).decode(),
+            "states": b64encode(array('b', (entry[2] for entry in entries)).tobytes()).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, capacity: int, data: dict) -> "PlayerHistory":
+        timestamps, game_ids, states = array('d'), array('Q'), array('b')
+        timestamps.frombytes(b64decode(data["timestamps"]))
+        game_ids.frombytes(b64decode(data["game_ids"]))
+        states.frombytes(b64decode(data["states"]))
+        history = cls(capacity)
+        for timestamp, game, state in list(zip(timestamps, game_ids, states))[-capacity:]:
+            history.append(timestamp, str(game) if game != NO_GAME else None, state)
+        return history
+
+    @property
+    def _last_index(self) -> int:
+        return (self.head - 1) % self.capacity
+
+
+class PresenceHistory:
+    """Per-player presence history kept in memory, snapshotted to a JSON file and restored at startup."""
+
+    def __init__(self, path: str, capacity: int):
+        self.path = Path(path)
+        self.capacity = capacity
+        self.players: dict[str, PlayerHistory] = {}
+        self.names: dict[str, str] = {}
+        self._dirty = False
+
+    def record(self, player: dict, timestamp: float) -> None:
+        steam_id = player['steamid']
+        if name := player.get('personaname'):
+            self.names[steam_id] = name
+        history = self.players.get(steam_id)
+        if history is None:
+            history = self.players[steam_id] = PlayerHistory(self.capacity)
+        if history.append(timestamp, player.get('gameid'), player.get('personastate', 0)):
+            self._dirty = True
+
+    def current_game(self, steam_id: str) -> Optional[str]:
+        history = self.players.get(steam_id)
+        last = history.last() if history else None
+        return last[1] if last else None
+
+    def online_players(self) -> list[tuple[str, Optional[str]]]:
+        """(name, game ID) of every player whose latest state is online."""
+        online = []
+        for steam_id, history in self.players.items():
+            last = history.last()
+            if last and (last[1] or last[2] != 0):
+                online.append((self.names.get(steam_id, steam_id), last[1]))
+        return online
+
+    def hours_played(self, game_id: str, since: float, until: float) -> dict[str, float]:
+        hours = {}
+        for steam_id, history in self.players.items():
+            seconds = sum(end - start for start, end in history.play_intervals(game_id, since, until))
+            if seconds > 0:
+                hours[self.names.get(steam_id, steam_id)] = seconds / 3600
+        return hours
+
+    def streaks(self, game_id: str, until: float, timezone) -> dict[str, int]:
+        """Consecutive days, up to today or yesterday, on which each player played `game_id`."""
+        today = datetime.fromtimestamp(until, timezone).date()
+        streaks = {}
+        for steam_id, history in self.players.items():
+            days = set()
+            for start, end in history.play_intervals(game_id, 0, until):
+                day = datetime.fromtimestamp(start, timezone).date()
+                last_day = datetime.fromtimestamp(end, timezone).date()
+                while day <= last_day:
+                    days.add(day)
+                    day += timedelta(days=1)
+
+            day = today if today in days else today - timedelta(days=1)
+            streak = 0
+            while day in days:
+                streak += 1
+                day -= timedelta(days=1)
+            if streak:
+                streaks[self.names.get(steam_id, steam_id)] = streak
+        return streaks
+
+    async def save(self) -> None:
+        """Snapshot the history on the event loop, where it changes, and write the file in a worker thread."""
+        if not self._dirty:
+            return
+        snapshot = json.dumps({"names": self.names,
+                               "players": {steam_id: history.to_dict() for steam_id, history in self.players.items()}})
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception:
+            self._dirty = True
+            raise
+
+    def _write(self, snapshot: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.path.with_suffix(".tmp")
+        temporary_path.write_text(snapshot, encoding="utf-8")
+        os.replace(temporary_path, self.path)
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            snapshot = json.loads(self.path.read_text(encoding="utf-8"))
+            self.names = snapshot["names"]
+            self.players = {steam_id: PlayerHistory.from_dict(self.capacity, data)
+                            for steam_id, data in snapshot["players"].items()}
+            logger.info(f"Restored presence history for {len(self.players)} players")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable presence history {self.path}: {e}")
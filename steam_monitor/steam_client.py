@@ -0,0 +1,92 @@
+import asyncio
+import random
+from logging import getLogger
+from typing import Iterable, Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+logger = getLogger(__name__)
+
+PLAYER_SUMMARIES_URL = "https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2/"
+MAX_IDS_PER_REQUEST = 100
+MAX_CONCURRENT_REQUESTS = 4
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 30.0
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+REQUEST_TIMEOUT = 15
+
+
+class SteamApiError(Exception):
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class SteamClient:
+    """Long-lived Steam Web API client.
+
+    One pooled keep-alive session is reused across polling cycles, and player lookups are split into
+    chunks of 100 IDs (the GetPlayerSummaries limit) that are queried concurrently.
+    """
+
+    def __init__(self, api_key: str, max_concurrency: int = MAX_CONCURRENT_REQUESTS, max_retries: int = MAX_RETRIES):
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[ClientSession] = None
+
+    async def get_player_summaries(self, steam_ids: Iterable) -> list[dict]:
+        ids = [str(steam_id) for steam_id in steam_ids]
+        chunks = [ids[start:start + MAX_IDS_PER_REQUEST] for start in range(0, len(ids), MAX_IDS_PER_REQUEST)]
+        results = await asyncio.gather(*(self._fetch_chunk(chunk) for chunk in chunks), return_exceptions=True)
+
+        players = []
+        errors = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to fetch {len(chunk)} Steam player summaries: {result}")
+                errors.append(result)
+            else:
+                players.extend(result)
+        if errors and len(errors) == len(chunks):
+            raise errors[0]
+        return players
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(limit=self._max_concurrency, ttl_dns_cache=DNS_CACHE_TTL,
+                                     keepalive_timeout=KEEPALIVE_TIMEOUT)
+            self._session = ClientSession(connector=connector, timeout=ClientTimeout(total=REQUEST_TIMEOUT))
+        return self._session
+
+    async def _fetch_chunk(self, steam_ids: list[str]) -> list[dict]:
+        params = {"key": self.api_key, "steamids": ",".join(steam_ids)}
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                async with self._get_session().get(PLAYER_SUMMARIES_URL, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        return data['response']['players']
+
+                    retryable = response.status == 429 or response.status >= 500
+                    if not retryable or attempt == self.max_retries:
+                        raise SteamApiError(f"Steam API returned {response.status}", status=response.status)
+                    delay = self._backoff_delay(attempt, response.headers.get("Retry-After"))
+
+            # Back off outside the semaphore so other chunks keep going
+            logger.warning(f"Steam API returned {response.status}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff_delay(attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF)
+        return min(BACKOFF_BASE * 2 ** attempt, MAX_BACKOFF) * random.uniform(0.8, 1.2)
@@ -1,32 +1,60 @@
 from asyncio import create_task, sleep
 from functools import cache
 from logging import getLogger
+from time import time
+from typing import Optional
 
-from aiohttp import ClientSession
-
-from steam_monitor.handle_cs2_monitor import handle_cs2_start
+from steam_monitor.alert_dispatcher import AlertDispatcher
+from steam_monitor.game_rules import GameRuleRegistry
+from steam_monitor.poll_schedule import PollSchedule
+from steam_monitor.presence_history import PresenceHistory
+from steam_monitor.steam_client import SteamClient
 
 logger = getLogger(__name__)
 
+MAX_IDLE_SLEEP = 60
+
 
 class SteamMonitor:
     def __init__(self, propaganda_bot):
         self.propaganda_bot = propaganda_bot
         self.watching_steam_ids = set()
-        self.previous_statuses = {}
+        monitor_config = propaganda_bot.propaganda_config.steam_monitor
+        self.history = PresenceHistory(monitor_config.history_file, monitor_config.history_capacity)
+        self.history.load()
+        # Last seen game ID per player (None when not in a game), restored so a restart does not re-alert
+        self.previous_games: dict[str, Optional[str]] = {
+            steam_id: self.history.current_game(steam_id) for steam_id in self.history.players}
         self.is_monitoring = False
+        self.steam_client = SteamClient(propaganda_bot.propaganda_config.steam_api_key)
+        self.poll_schedule = PollSchedule(monitor_config, lambda: self.alert_settings().timezone)
+        self.game_rules = GameRuleRegistry.from_config(propaganda_bot.propaganda_config)
+        self.alert_dispatcher = AlertDispatcher(self, monitor_config.alert_debounce_seconds,
+                                                monitor_config.alert_coalesce_window)
+
+    def alert_settings(self):
+        """Voice channel and timezone for alerts and quiet hours: those of the guild that owns the globally
+        configured voice channel, so its /set_voice_channel and /set_timezone apply, else the global ones."""
+        scheduler_config = self.propaganda_bot.propaganda_config.propaganda_scheduler
+        guild_config = self.propaganda_bot.guild_configs.for_channel(self.propaganda_bot,
+                                                                     scheduler_config.voice_channel_id)
+        return guild_config or scheduler_config
 
     async def start(self):
         """Start monitoring all configured Steam profiles."""
         try:
-            steam_ids = self.propaganda_bot.propaganda_config.propaganda_scheduler.get(
-                "steam_ids", [])
+            steam_ids = self.propaganda_bot.propaganda_config.propaganda_scheduler.steam_ids
             if not steam_ids:
                 logger.warning("No Steam IDs configured for monitoring")
                 return
 
             self.watching_steam_ids = set(steam_ids)
+            self.poll_schedule.watch(self.watching_steam_ids, time())
+            self.alert_dispatcher.start()
+            # Set before the task runs so a second start() (e.g. on a gateway reconnect) sees it
+            self.is_monitoring = True
             create_task(self._monitor_loop())
+            create_task(self._snapshot_loop())
             logger.info("Steam monitoring started successfully")
 
         except Exception as e:
@@ -34,52 +62,90 @@ class SteamMonitor:
             self.is_monitoring = False
 
     async def _monitor_loop(self):
-        """Background task for Steam monitoring."""
-        self.is_monitoring = True
+        """Background task for Steam monitoring, polling only the accounts whose tier says they are due."""
         while self.is_monitoring:
+            due = []
             try:
-                steam_ids = ','.join(self.watching_steam_ids)
-                api_key = self.propaganda_bot.propaganda_config.steam_api_key
-
-                async with ClientSession() as session:
-                    url = f"https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2/?key={api_key}&steamids={steam_ids}"
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            data = await response.json()
-
-                            for player in data['response']['players']:
-                                steam_id = player['steamid']
-                                game_id = player.get('gameid')
-                                is_playing_cs2 = game_id == '730'  # CS2/CSGO game ID
-
-                                was_playing_cs2 = self.previous_statuses.get(
-                                    steam_id, False)
-
-                                if is_playing_cs2 and not was_playing_cs2:
-                                    logger.info(
-                                        f"User {steam_id} started playing CS2!"
-                                    )
-                                    await handle_cs2_start(self)
-                                elif not is_playing_cs2 and was_playing_cs2:
-                                    logger.info(
-                                        f"User {steam_id} stopped playing CS2."
-                                    )
-                                    # Reset status when they stop playing
-                                    self.previous_statuses[steam_id] = False
-                                else:
-                                    # Always update the status
-                                    self.previous_statuses[
-                                        steam_id] = is_playing_cs2
-
-                await sleep(30)  # Check every 30 seconds
+                due = self.poll_schedule.pop_due(time())
+                if due:
+                    await self._poll(due)
+
+                wait = self.poll_schedule.seconds_until_next(time())
+                await sleep(MAX_IDLE_SLEEP if wait is None else min(wait, MAX_IDLE_SLEEP))
 
             except Exception as e:
-                logger.error(f"Error in Steam monitoring loop: {e}")
+                logger.error(f"Error in Steam monitoring loop: {e}", exc_info=True)
+                # Accounts taken off the schedule this cycle would otherwise never be polled again
+                self.poll_schedule.retry(due, time())
                 await sleep(5)  # Wait before retrying
 
+    async def _poll(self, steam_ids: list[str]):
+        try:
+            players = await self.steam_client.get_player_summaries(steam_ids)
+        except Exception as e:
+            logger.error(f"Error in Steam monitoring loop: {e}")
+            self.poll_schedule.retry(steam_ids, time())
+            return
+
+        now = time()
+        published = False
+        for player in players:
+            try:
+                self.poll_schedule.update(player, now)
+                self.history.record(player, now)
+                published |= self._handle_player(player)
+            except Exception as e:
+                # One malformed summary must not keep the rest of the batch from being handled
+                logger.error(f"Error handling Steam player {player.get('steamid')}: {e}", exc_info=True)
+                if 'steamid' in player:
+                    self.poll_schedule.retry([player['steamid']], now)
+        self.poll_schedule.mark_missing(set(steam_ids) - {player['steamid'] for player in players}, now)
+        if published:
+            # Saved right away rather than at the next snapshot, so a restart does not announce it again
+            await self._save_history()
+
+    def _handle_player(self, player: dict) -> bool:
+        """Publish started/stopped/switched transitions of watched games; the alert dispatcher handles them
+        off the polling loop. Returns whether anything was published."""
+        steam_id = player['steamid']
+        game_id = player.get('gameid')
+        previous_game_id = self.previous_games.get(steam_id)
+        self.previous_games[steam_id] = game_id
+        if game_id == previous_game_id:
+            return False
+        if game_id not in self.game_rules.game_ids and previous_game_id not in self.game_rules.game_ids:
+            return False
+
+        if game_id and previous_game_id:
+            kind = "switched"
+            logger.info(f"User {steam_id} switched from game {previous_game_id} to {game_id}")
+        elif game_id:
+            kind = "started"
+            logger.info(f"User {steam_id} started playing game {game_id}")
+        else:
+            kind = "stopped"
+            logger.info(f"User {steam_id} stopped playing game {previous_game_id}")
+        self.alert_dispatcher.publish(kind, player, previous_game_id)
+        return True
+
+    async def _snapshot_loop(self):
+        interval = self.propaganda_bot.propaganda_config.steam_monitor.history_snapshot_interval
+        while self.is_monitoring:
+            await sleep(interval)
+            await self._save_history()
+
+    async def _save_history(self):
+        try:
+            await self.history.save()
+        except Exception as e:
+            logger.error(f"Failed to save presence history: {e}")
+
     async def stop(self):
-        """Stop monitoring Steam profiles."""
+        """Stop monitoring Steam profiles, saving the presence history."""
         self.is_monitoring = False
+        await self._save_history()
+        self.alert_dispatcher.stop()
+        await self.steam_client.close()
 
 
 @cache